@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+from auth import DATA_DIR
+from parsers.models import AttendanceCourse
+
+ATTENDANCE_FILE = Path(os.getenv("FLEX_ATTENDANCE_FILE", DATA_DIR / "attendance.json")).expanduser()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _parse_time(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class AttendanceStore:
+    """Last known attendance per roll number, semester, course and lecture_no.
+
+    Each lecture and percentage carries the time it was last seen to change, so
+    callers can ask for only what changed since a previous sync.
+    """
+
+    def __init__(self, path: Path = ATTENDANCE_FILE):
+        self.path = path
+        self._data: Optional[dict] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        if self._data is None:
+            try:
+                self._data = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._data = {}
+        return self._data
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._data), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def sync(self, roll_no: str, semester_id: str, courses: list[AttendanceCourse]) -> tuple[Optional[str], str]:
+        """Merge freshly parsed courses into the store.
+
+        Returns (previous sync time or None, this sync time).
+        """
+        with self._lock:
+            semester = self._load().setdefault(roll_no, {}).setdefault(semester_id, {"synced_at": None, "courses": {}})
+            previous, now = semester["synced_at"], _now()
+
+            for course in courses:
+                key = course.course_code or course.course_name
+                stored = semester["courses"].setdefault(key, {
+                    "course_code": course.course_code,
+                    "course_name": course.course_name,
+                    "section": course.section,
+                    "attendance_percentage": None,
+                    "percentage_updated_at": None,
+                    "lectures": {}
+                })
+
+                if stored["attendance_percentage"] != course.attendance_percentage:
+                    stored["attendance_percentage"] = course.attendance_percentage
+                    stored["percentage_updated_at"] = now
+
+                for lecture in course.lectures:
+                    known = stored["lectures"].get(lecture.lecture_no)
+                    record = {
+                        "date": lecture.date,
+                        "duration_hours": lecture.duration_hours,
+                        "presence": lecture.presence
+                    }
+                    if known is None or any(known[k] != v for k, v in record.items()):
+                        stored["lectures"][lecture.lecture_no] = {**record, "updated_at": now}
+
+            semester["synced_at"] = now
+            self._save()
+            return previous, now
+
+    def changes(self, roll_no: str, semester_id: str, since: Optional[str]) -> list[dict[str, Any]]:
+        """Courses with lectures or percentages that changed after since (everything if since is None)."""
+        with self._lock:
+            semester = self._load().get(roll_no, {}).get(semester_id, {"courses": {}})
+            cutoff = _parse_time(since) if since else None
+
+            def changed(stamp: Optional[str]) -> bool:
+                return stamp is not None and (cutoff is None or _parse_time(stamp) > cutoff)
+
+            result = []
+            for stored in semester["courses"].values():
+                lectures = [
+                    {"lecture_no": lecture_no, **{k: v for k, v in lecture.items() if k != "updated_at"}}
+                    for lecture_no, lecture in stored["lectures"].items()
+                    if changed(lecture["updated_at"])
+                ]
+                if lectures or changed(stored["percentage_updated_at"]):
+                    result.append({
+                        "course_code": stored["course_code"],
+                        "course_name": stored["course_name"],
+                        "attendance_percentage": stored["attendance_percentage"],
+                        "lectures": lectures
+                    })
+            return result
+
+
+_store: Optional[AttendanceStore] = None
+
+def get_attendance_store() -> AttendanceStore:
+    global _store
+    if _store is None:
+        _store = AttendanceStore()
+    return _store
@@ -1,217 +1,581 @@
+import asyncio
+import importlib.util
+import json
 import os
-import re
 import sys
 import time
-from typing import Optional
-
-import httpx
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AsyncContextManager, AsyncIterator, Callable, Optional
+
 from dotenv import load_dotenv
 
+import session_store
+from parsers.patterns import extract_dump_tokens
+from cache import CacheEntry, CacheKey, get_cache
+from throttle import get_rate_limiter, get_single_flight
+from metrics import get_metrics, span
+
+if TYPE_CHECKING:
+    import httpx
+
+# httpx, Selenium and webdriver-manager are imported where they are first needed,
+# so registering tools (every MCP client spawn) stays fast
+
 load_dotenv()
 
-BASE_URL = "https://flexstudent.nu.edu.pk"
+# Point at a local stand-in (benchmarks/mock_portal.py) with FLEX_BASE_URL
+BASE_URL = os.getenv("FLEX_BASE_URL", "https://flexstudent.nu.edu.pk").rstrip("/")
+DATA_DIR = Path(os.getenv("FLEX_DATA_DIR", Path.home() / ".flex-mcp")).expanduser()
+SESSION_FILE = Path(os.getenv("FLEX_SESSION_FILE", DATA_DIR / "session.bin")).expanduser()
+# Optional JSON object of {"roll number": "password"} for serving several students
+ACCOUNTS_FILE = os.getenv("FLEX_ACCOUNTS_FILE")
+# Login bypass for mock portals and load tests: JSON object of cookies to use instead of
+# logging in, "{nonce}" in a value is replaced with a fresh token on every login
+INJECT_COOKIES = os.getenv("FLEX_INJECT_COOKIES")
+# Parse attendance and marks as they download instead of from a whole page (parsers/stream.py)
+STREAM_PARSE = os.getenv("FLEX_STREAM_PARSE", "").lower() in ("1", "true", "yes")
+# True inside background work (prefetch): its requests never log in again or keep a session from idling out
+background: ContextVar[bool] = ContextVar("flex_background", default=False)
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36"
 
 
 def _log(msg: str):
     print(msg, file=sys.stderr)
 
 
-def _find_chrome_binary() -> Optional[str]:
-    """Find Chrome binary path on Windows."""
-    if sys.platform != "win32":
-        return None  # Let Selenium find it on other platforms
-    
-    # Common Chrome installation paths on Windows
-    possible_paths = [
-        os.path.expandvars(r"%ProgramFiles%\Google\Chrome\Application\chrome.exe"),
-        os.path.expandvars(r"%ProgramFiles(x86)%\Google\Chrome\Application\chrome.exe"),
-        os.path.expandvars(r"%LocalAppData%\Google\Chrome\Application\chrome.exe"),
-        r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-        r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
-    ]
-    
-    for path in possible_paths:
-        if os.path.exists(path):
-            _log(f"Found Chrome at: {path}")
-            return path
-    
-    return None
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+# Element ids that only appear on the login form
+_LOGIN_MARKERS = ('id="m_login_signin_submit"', 'id="m_inputmask_4"')
+
+
+class SessionExpired(RuntimeError):
+    """The portal answered with its login page instead of the requested page."""
+
+
+class BackgroundSessionExpired(SessionExpired):
+    """The session expired under a background fetch, which never logs in again itself."""
+
+
+class LoginScan:
+    """Looks for the login form in a page read chunk by chunk, including markers split across chunks."""
+
+    KEEP = max(len(marker) for marker in _LOGIN_MARKERS) - 1
+
+    def __init__(self):
+        self._tail = ""
+
+    def found(self, chunk: str) -> bool:
+        text = self._tail + chunk
+        self._tail = text[-self.KEEP:]
+        return any(marker in text for marker in _LOGIN_MARKERS)
+
+
+def _is_login_page(response: "httpx.Response", read: bool = True) -> bool:
+    """Whether the portal sent its login page. Unread (streamed) responses are judged by URL only."""
+    if response.url.path.rstrip("/").endswith("/Login"):
+        return True
+    if not read or "html" not in response.headers.get("content-type", ""):
+        return False
+    return any(marker in response.text for marker in _LOGIN_MARKERS)
+
+
+def _timed_parse(parser: Callable[..., Any], html: str, options: dict) -> Any:
+    with span("parse", parser=parser.__name__):
+        return parser(html, **options)
 
 
 class FlexSession:
     
-    def __init__(self):
-        self.client: Optional[httpx.Client] = None
+    def __init__(self, roll_no: Optional[str] = None, password: Optional[str] = None):
+        self.client: Optional["httpx.AsyncClient"] = None
         self.cookies: dict = {}
         self.page_dumps: dict = {}
         self._logged_in = False
+        self.roll_no = roll_no if roll_no is not None else os.getenv("FLEX_ROLL_NO", "")
+        self._password = password if password is not None else os.getenv("FLEX_PASSWORD")
+        self.session_file = (
+            SESSION_FILE if self.roll_no == os.getenv("FLEX_ROLL_NO", "")
+            else DATA_DIR / "sessions" / f"{self.roll_no}.bin"
+        )
+        self.last_used = time.monotonic()
+        self.in_flight = 0
+        self._foreground = 0
+        self._foreground_idle = asyncio.Event()
+        self._foreground_idle.set()
+        self.cache = get_cache()
+        self.limiter = get_rate_limiter()
+        self.flights = get_single_flight()
+        self.login_lock = asyncio.Lock()
+        # Bumped on every login so concurrent callers can tell a re-login already happened
+        self._generation = 0
     
-    def login(self) -> bool:
-        roll_no = os.getenv("FLEX_ROLL_NO")
-        password = os.getenv("FLEX_PASSWORD")
-        
-        if not roll_no or not password:
+    @property
+    def generation(self) -> int:
+        """Login count, to pass to stream_expired when a streamed page turns out to be the login form."""
+        return self._generation
+    
+    def _credentials(self) -> tuple[str, str]:
+        if not self.roll_no or not self._password:
             raise ValueError("FLEX_ROLL_NO and FLEX_PASSWORD must be set in environment")
+        return self.roll_no, self._password
+    
+    def _build_client(self):
+        import httpx
         
-        options = webdriver.ChromeOptions()
-        options.add_argument("--start-maximized")
-        options.add_argument("--log-level=3")
-        options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
-        options.add_experimental_option("useAutomationExtension", False)
+        self.client = httpx.AsyncClient(
+            base_url=BASE_URL,
+            cookies=self.cookies,
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True,
+            timeout=30.0,
+            http2=_http2_available(),
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5)
+        )
+    
+    async def restore(self) -> bool:
+        """Rehydrate the session from the encrypted session file if it is still alive."""
+        roll_no, password = self._credentials()
+        with span("login", phase="session_load"):
+            stored = await asyncio.to_thread(session_store.load_session, self.session_file, roll_no, password)
+        if not stored:
+            return False
         
-        chrome_path = _find_chrome_binary()
-        if chrome_path:
-            options.binary_location = chrome_path
+        self.cookies = stored["cookies"]
+        self.page_dumps = stored["page_dumps"]
+        self._build_client()
+        self._generation += 1
         
-        os.environ['WDM_LOG_LEVEL'] = '0'
+        with span("login", phase="probe"):
+            alive = await self.is_alive()
+        if not alive:
+            _log("Stored session has expired, a fresh login is required")
+            await self.close()
+            self.client = None
+            self.cookies = {}
+            self.page_dumps = {}
+            session_store.clear_session(self.session_file)
+            return False
         
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=options
-        )
+        self._logged_in = True
+        return True
+    
+    async def is_alive(self) -> bool:
+        """Cheap liveness probe: the dashboard answers 200 instead of redirecting to /Login."""
+        import httpx
         
+        if not self.client:
+            return False
         try:
-            driver.get(f"{BASE_URL}/Login")
-            
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.ID, "m_inputmask_4"))
-            )
-            
-            username_field = driver.find_element(By.ID, "m_inputmask_4")
-            password_field = driver.find_element(By.ID, "pass")
-            
-            username_field.clear()
-            username_field.send_keys(roll_no)
-            password_field.clear()
-            password_field.send_keys(password)
-            
-            time.sleep(2)
-            
-            recaptcha_iframe = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "iframe[src*='recaptcha']"))
-            )
-            driver.switch_to.frame(recaptcha_iframe)
-            
-            checkbox = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, ".recaptcha-checkbox-border"))
-            )
-            checkbox.click()
-            
-            driver.switch_to.default_content()
-            
-            # Wait for CAPTCHA to be solved (either auto-pass or human solves image challenge)
-            _log("Waiting for CAPTCHA to be solved...")
-            _log("If an image challenge appears, please solve it manually.")
-            
-            captcha_timeout = 120  # 2 minutes for human to solve if needed
-            captcha_solved = False
-            start_time = time.time()
-            
-            while time.time() - start_time < captcha_timeout:
-                try:
-                    # Check if g-recaptcha-response has a value (means CAPTCHA is solved)
-                    recaptcha_response = driver.execute_script(
-                        "return document.getElementById('g-recaptcha-response')?.value || '';"
-                    )
-                    if recaptcha_response:
-                        _log("CAPTCHA solved successfully!")
-                        captcha_solved = True
-                        break
-                except Exception:
-                    pass
-                time.sleep(1)
-            
-            if not captcha_solved:
-                raise Exception("CAPTCHA was not solved within the timeout period")
-            
-            sign_in_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.ID, "m_login_signin_submit"))
-            )
-            sign_in_button.click()
-            
-            WebDriverWait(driver, 30).until(
-                lambda d: "/Login" not in d.current_url
-            )
-            
-            page_source = driver.page_source
-            dump_links = re.findall(r'href="(/[^"]*\?[^"]*dump=([^"&]+)[^"]*)"', page_source)
-            
-            for full_url, dump_value in dump_links:
-                path = re.sub(r'\?.*', '', full_url)
-                self.page_dumps[path] = dump_value
-            
-            dump_patterns = re.findall(r'(/[A-Za-z][^"\'?]*)\?[^"\']*dump=([^"\'&]+)', page_source)
-            for path, dump_value in dump_patterns:
-                if path not in self.page_dumps:
-                    self.page_dumps[path] = dump_value
-            
-            selenium_cookies = driver.get_cookies()
-            for cookie in selenium_cookies:
-                self.cookies[cookie["name"]] = cookie["value"]
-            
-            self.client = httpx.Client(
-                base_url=BASE_URL,
-                cookies=self.cookies,
-                headers={
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36"
-                },
-                follow_redirects=True,
-                timeout=30.0
-            )
-            
-            self._logged_in = True
-            return True
+            response = await self.client.get("/", follow_redirects=False)
+        except httpx.HTTPError as e:
+            _log(f"Session probe failed: {e}")
+            return False
+        if response.is_redirect:
+            return "/Login" not in response.headers.get("location", "")
+        return response.status_code == 200
+    
+    async def login(self) -> bool:
+        roll_no, password = self._credentials()
+        
+        self.cookies = {}
+        if INJECT_COOKIES:
+            ok = self._inject_cookies()
+        else:
+            # Selenium is blocking, keep it off the event loop
+            with span("login", phase="browser"):
+                ok = await asyncio.to_thread(self._browser_login, roll_no, password)
+        if not ok:
+            return False
+        
+        if self.client:
+            # Keep the pooled client (and requests in flight on it), just swap the cookies
+            self.client.cookies.clear()
+            self.client.cookies.update(self.cookies)
+        else:
+            self._build_client()
+        self._generation += 1
+        self._logged_in = True
+        
+        try:
+            with span("login", phase="session_save"):
+                # Key derivation and file I/O, kept off the event loop
+                await asyncio.to_thread(
+                    session_store.save_session, self.session_file, roll_no, password,
+                    dict(self.cookies), dict(self.page_dumps)
+                )
+        except OSError as e:
+            _log(f"Could not persist session: {e}")
+        return True
+    
+    def _browser_login(self, roll_no: str, password: str) -> bool:
+        try:
+            import browser
             
+            cookies, page_source = browser.browser_login(roll_no, password)
         except Exception as e:
             _log(f"Login error: {e}")
             return False
-        finally:
-            driver.quit()
+        
+        self.page_dumps.update(extract_dump_tokens(page_source))
+        self.cookies.update(cookies)
+        return True
+    
+    def _inject_cookies(self) -> bool:
+        """Take cookies from FLEX_INJECT_COOKIES instead of opening a browser."""
+        try:
+            cookies = json.loads(INJECT_COOKIES)
+        except json.JSONDecodeError as e:
+            _log(f"FLEX_INJECT_COOKIES is not a JSON object: {e}")
+            return False
+        nonce = uuid.uuid4().hex
+        self.cookies.update({name: str(value).replace("{nonce}", nonce) for name, value in cookies.items()})
+        return True
     
-    def get(self, path: str) -> httpx.Response:
+    def _require_client(self) -> "httpx.AsyncClient":
         if not self._logged_in or not self.client:
             raise RuntimeError("Not logged in. Call login() first.")
-        return self.client.get(path)
+        return self.client
     
-    def get_html(self, path: str, append_dump: bool = True) -> str:
-        if append_dump and "dump=" not in path:
-            base_path = path.split("?")[0]
-            dump_token = self.page_dumps.get(base_path)
-            
-            if dump_token:
-                separator = "&" if "?" in path else "?"
-                path = f"{path}{separator}dump={dump_token}"
+    def _with_dump(self, path: str) -> str:
+        if "dump=" in path:
+            return path
+        dump_token = self.page_dumps.get(path.split("?")[0])
+        if not dump_token:
+            return path
+        separator = "&" if "?" in path else "?"
+        return f"{path}{separator}dump={dump_token}"
+    
+    async def relogin(self, seen_generation: int) -> None:
+        """Log in again after the portal session expired.
+        
+        Callers that saw the same expired session coalesce onto one login: whoever
+        gets the lock first logs in, the rest find the generation moved on and return.
+        """
+        async with self.login_lock:
+            if self._generation != seen_generation:
+                return
+            _log(f"Portal session for {self.roll_no} expired, logging in again")
+            session_store.clear_session(self.session_file)
+            if not await self.login():
+                self._logged_in = False
+                raise SessionExpired("Portal session expired and logging in again failed")
+    
+    async def _request(self, method: str, url: str, read: bool = True, **kwargs) -> "httpx.Response":
+        """Send one request through the host's rate limiter, retrying while the portal asks us to back off.
+        
+        With read=False the body is left unread for the caller to stream and close.
+        """
+        client = self._require_client()
+        host = client.base_url.host
+        endpoint = url.partition("?")[0]
+        for attempt in range(self.limiter.retries + 1):
+            await self.limiter.acquire(host)
+            with span("fetch", endpoint=endpoint):
+                response = await client.send(client.build_request(method, url, **kwargs), stream=True)
+                if read:
+                    try:
+                        await response.aread()
+                    finally:
+                        await response.aclose()
+            if read:
+                get_metrics().inc("fetch_bytes", len(response.content), endpoint=endpoint)
+            throttled = self.limiter.record(host, response.status_code, response.headers.get("retry-after"))
+            if not throttled or attempt == self.limiter.retries:
+                return response
+            if not read:
+                await response.aclose()
+            _log(f"Portal returned {response.status_code} for {url}, backing off")
+        return response
+    
+    @asynccontextmanager
+    async def _open(self, method: str, path: str, append_dump: bool = False, read: bool = True,
+                    **kwargs) -> AsyncIterator["httpx.Response"]:
+        """Send a request, re-logging in once and replaying it if the session has expired.
+        
+        The request counts as in flight until the block exits, so a streamed
+        body is read while prefetching and idle eviction hold off.
+        """
+        foreground = not background.get()
+        self.in_flight += 1
+        if foreground:
+            self._foreground += 1
+            self._foreground_idle.clear()
+            self.last_used = time.monotonic()
+        try:
+            for attempt in range(2):
+                generation = self._generation
+                url = self._with_dump(path) if append_dump else path
+                response = await self._request(method, url, read, **kwargs)
+                if not _is_login_page(response, read):
+                    try:
+                        yield response
+                    finally:
+                        if not read:
+                            await response.aclose()
+                            get_metrics().inc("fetch_bytes", response.num_bytes_downloaded,
+                                              endpoint=url.partition("?")[0])
+                    return
+                if not read:
+                    await response.aclose()
+                if attempt == 0:
+                    if not foreground:
+                        raise BackgroundSessionExpired(f"Portal session expired during a background fetch of {path}")
+                    await self.relogin(generation)
+            raise SessionExpired(f"Portal session expired while fetching {path}")
+        finally:
+            self.in_flight -= 1
+            if foreground:
+                self._foreground -= 1
+                if not self._foreground:
+                    self._foreground_idle.set()
+                self.last_used = time.monotonic()
+    
+    async def _send(self, method: str, path: str, append_dump: bool = False, **kwargs) -> "httpx.Response":
+        async with self._open(method, path, append_dump, **kwargs) as response:
+            return response
+    
+    def stream(self, path: str, append_dump: bool = False,
+               headers: Optional[dict] = None) -> AsyncContextManager["httpx.Response"]:
+        """GET a page without reading its body, for `async with session.stream(path) as response`.
+        
+        Read it with response.aiter_bytes() so large downloads are never held in memory whole.
+        Expired sessions are only noticed when the portal redirects to /Login, so
+        callers reading HTML check chunks with LoginScan and call stream_expired.
+        """
+        return self._open("GET", path, append_dump, read=False, headers=headers)
+    
+    async def wait_foreground_idle(self) -> None:
+        """Wait until no tool call has a request in flight on this session."""
+        await self._foreground_idle.wait()
+    
+    async def _coalesced(self, key: tuple, fn: Callable[[], Any]) -> Any:
+        """flights.do, except that a tool call which joined a prefetch's flight on an
+        expired session logs in again and retries instead of failing with it.
+        
+        A flight runs in the context of whoever started it, so a background
+        leader's requests never log in again, even with foreground followers.
+        """
+        generation = self._generation
+        try:
+            return await self.flights.do(key, fn)
+        except BackgroundSessionExpired:
+            if background.get():
+                raise
+            await self.relogin(generation)
+            return await self.flights.do(key, fn)
+    
+    async def get(self, path: str, headers: Optional[dict] = None) -> "httpx.Response":
+        return await self._send("GET", path, headers=headers)
+    
+    async def post(self, path: str, data: Optional[dict] = None, coalesce: bool = False) -> "httpx.Response":
+        """POST form data. With coalesce, identical POSTs already in flight share one response,
+        so only use it for requests that just read data."""
+        if not coalesce:
+            return await self._send("POST", path, data=data)
+        key = ("POST", path, self.roll_no, tuple(sorted((data or {}).items())))
+        return await self._coalesced(key, lambda: self._send("POST", path, data=data))
+    
+    async def get_html(self, path: str, append_dump: bool = True, use_cache: bool = True) -> str:
+        key = self.cache.key(path, self.roll_no)
+        entry = self.cache.get(key) if use_cache else None
+        if entry and entry.is_fresh():
+            return entry.text
+        
+        # Identical fetches already in flight share one request
+        return await self._coalesced(
+            ("GET", *key), lambda: self._fetch_html(path, key, entry, append_dump, use_cache)
+        )
+    
+    async def _fetch_html(self, path: str, key: CacheKey, entry: Optional[CacheEntry],
+                          append_dump: bool, use_cache: bool) -> str:
+        response = await self._send(
+            "GET", path, append_dump=append_dump, headers=entry.validators() if entry else None
+        )
+        if entry and response.status_code == 304:
+            self.cache.refresh(key)
+            return entry.text
         
-        response = self.get(path)
         response.raise_for_status()
+        if use_cache:
+            self.cache.put(
+                key,
+                response.text,
+                etag=response.headers.get("etag"),
+                last_modified=response.headers.get("last-modified"),
+            )
         return response.text
     
+    async def get_parsed(self, path: str, parser: Callable[..., Any], **options) -> Any:
+        """Fetch a page and run its parser in a worker thread, off the event loop.
+        
+        Options (e.g. filters) are passed on to the parser. With FLEX_STREAM_PARSE,
+        a page with an incremental parser and no fresh cached copy is parsed as it
+        downloads, never holding the whole page; such pages are not cached.
+        """
+        stream_parser = None
+        if STREAM_PARSE:
+            from parsers.stream import streaming_parser
+            stream_parser = streaming_parser(parser)
+        if stream_parser is None:
+            html = await self.get_html(path)
+        else:
+            key = self.cache.key(path, self.roll_no)
+            entry = self.cache.get(key)
+            if not (entry and entry.is_fresh()):
+                flight = ("STREAM", *key, tuple(sorted(options.items())))
+                return await self._coalesced(flight, lambda: self._stream_parsed(path, stream_parser, options))
+            html = entry.text
+        return await asyncio.to_thread(_timed_parse, parser, html, options)
+    
+    async def stream_expired(self, seen_generation: int, path: str) -> None:
+        """Handle a streamed page that turned out to be the login form, as _open does for others:
+        log in again so the caller can fetch it once more, or raise for background fetches."""
+        if background.get():
+            raise BackgroundSessionExpired(f"Portal session expired during a background fetch of {path}")
+        await self.relogin(seen_generation)
+    
+    async def _stream_parsed(self, path: str, stream_parser: Callable[..., Any], options: dict) -> Any:
+        """Feed a streamed page to an incremental parser chunk by chunk, in a worker thread.
+        
+        The portal can answer with its login form under the page's own URL, so every
+        chunk of an HTML page is checked for it. Such a page is never returned as a
+        result; it is fetched again after logging in like any other request.
+        """
+        for attempt in range(2):
+            generation = self._generation
+            parser, seconds, expired = stream_parser(**options), 0.0, False
+            async with self.stream(path, append_dump=True) as response:
+                response.raise_for_status()
+                scan = LoginScan() if "html" in response.headers.get("content-type", "") else None
+                async for chunk in response.aiter_text():
+                    if scan and scan.found(chunk):
+                        expired = True
+                        break
+                    start = time.perf_counter()
+                    await asyncio.to_thread(parser.feed, chunk)
+                    seconds += time.perf_counter() - start
+            if not expired:
+                result = parser.close()
+                get_metrics().observe("parse", seconds, parser=stream_parser.__name__)
+                return result
+            if attempt == 0:
+                await self.stream_expired(generation, path)
+        raise SessionExpired(f"Portal session expired while fetching {path}")
+    
     def is_logged_in(self) -> bool:
         return self._logged_in
     
-    def close(self):
+    async def close(self):
         if self.client:
-            self.client.close()
+            await self.client.aclose()
 
 
-_session: Optional[FlexSession] = None
+def _load_accounts() -> dict[str, str]:
+    """Credentials by roll number: FLEX_ACCOUNTS_FILE plus the FLEX_ROLL_NO/FLEX_PASSWORD account."""
+    accounts = {}
+    if ACCOUNTS_FILE:
+        with open(os.path.expanduser(ACCOUNTS_FILE), encoding="utf-8") as f:
+            accounts.update(json.load(f))
+    roll_no, password = os.getenv("FLEX_ROLL_NO"), os.getenv("FLEX_PASSWORD")
+    if roll_no and password:
+        accounts[roll_no] = password
+    return accounts
 
-def get_session() -> FlexSession:
-    global _session
-    if _session is None:
-        _session = FlexSession()
-    return _session
 
+class SessionRegistry:
+    """One FlexSession (and connection pool) per roll number.
+    
+    Idle sessions are closed least recently used first once there are more than
+    max_sessions, once they have been idle for idle_timeout seconds, or while the
+    pages cached for all accounts exceed max_cache_bytes. Sessions with requests
+    in flight are never evicted.
+    """
+    
+    def __init__(self, max_sessions: int = 8, idle_timeout: float = 30 * 60,
+                 max_cache_bytes: int = 64 * 1024 * 1024):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_cache_bytes = max_cache_bytes
+        self.accounts = _load_accounts()
+        self.default_account = os.getenv("FLEX_ROLL_NO", "")
+        self._sessions: OrderedDict[str, FlexSession] = OrderedDict()
+        self.evictions = 0
+    
+    @classmethod
+    def from_env(cls) -> "SessionRegistry":
+        return cls(
+            max_sessions=int(os.getenv("FLEX_MAX_SESSIONS", "8")),
+            idle_timeout=float(os.getenv("FLEX_SESSION_IDLE_TIMEOUT", str(30 * 60))),
+            max_cache_bytes=int(float(os.getenv("FLEX_SESSIONS_MAX_MB", "64")) * 1024 * 1024),
+        )
+    
+    def get(self, account: Optional[str] = None) -> FlexSession:
+        roll_no = account or self.default_account
+        session = self._sessions.get(roll_no)
+        if session is None:
+            if account and roll_no not in self.accounts:
+                raise ValueError(f"Unknown account {roll_no}; add it to FLEX_ACCOUNTS_FILE")
+            session = FlexSession(roll_no, self.accounts.get(roll_no))
+            self._sessions[roll_no] = session
+        self._sessions.move_to_end(roll_no)
+        self._evict(keep=roll_no)
+        return session
+    
+    def sessions(self) -> list[FlexSession]:
+        return list(self._sessions.values())
+    
+    def _evict(self, keep: str) -> None:
+        now = time.monotonic()
+        cache = get_cache()
+        for roll_no, session in list(self._sessions.items()):
+            if roll_no == keep or session.in_flight:
+                continue
+            over_count = len(self._sessions) > self.max_sessions
+            over_memory = cache.stats()["bytes"] > self.max_cache_bytes
+            idle = now - session.last_used > self.idle_timeout
+            if not (over_count or over_memory or idle):
+                continue
+            del self._sessions[roll_no]
+            cache.invalidate(roll_no)
+            self.evictions += 1
+            _log(f"Closing idle session for {roll_no}")
+            try:
+                asyncio.get_running_loop().create_task(session.close())
+            except RuntimeError:
+                pass  # No event loop, the client is dropped with the session
 
-def ensure_logged_in() -> FlexSession:
-    session = get_session()
-    if not session.is_logged_in():
-        if not session.login():
-            raise RuntimeError("Failed to login to FLEX portal")
+
+_registry: Optional[SessionRegistry] = None
+
+def get_registry() -> SessionRegistry:
+    global _registry
+    if _registry is None:
+        _registry = SessionRegistry.from_env()
+    return _registry
+
+
+def get_session(account: Optional[str] = None) -> FlexSession:
+    return get_registry().get(account)
+
+
+async def ensure_logged_in(account: Optional[str] = None) -> FlexSession:
+    session = get_session(account)
+    if session.is_logged_in():
+        return session
+    
+    # Concurrent tool calls share one restore/login instead of each opening Chrome
+    async with session.login_lock:
+        if not session.is_logged_in() and not await session.restore():
+            if not await session.login():
+                raise RuntimeError("Failed to login to FLEX portal")
+        from prefetch import schedule
+        schedule(session)
     return session
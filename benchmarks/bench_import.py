@@ -0,0 +1,81 @@
+"""Cold-start import benchmark for the MCP server.
+
+    python benchmarks/bench_import.py                 # median wall time of `import server` and the slowest modules
+    python benchmarks/bench_import.py --max-ms 2000   # exit 1 if the median exceeds the budget
+
+Each run is a fresh interpreter, the same as an MCP client spawning the server.
+It also fails if a module that should only load on demand is imported at startup.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Only needed for a browser login or the first parse, never to register tools
+DEFERRED_MODULES = ["selenium", "webdriver_manager", "bs4", "lxml"]
+
+PROBE = f"""
+import sys, time
+start = time.perf_counter()
+import server
+elapsed = time.perf_counter() - start
+loaded = [m for m in {DEFERRED_MODULES!r} if m in sys.modules]
+print(elapsed * 1000, ",".join(loaded))
+"""
+
+
+def run_once() -> tuple[float, list[str]]:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(output[0]), output[1].split(",") if len(output) > 1 else []
+
+
+def slowest_modules(limit: int) -> list[tuple[int, str]]:
+    """Modules with the highest cumulative import time (microseconds) from -X importtime."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server"], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-ms", type=float, help="fail if the median import time exceeds this")
+    args = parser.parse_args()
+
+    timings, eager = [], set()
+    for _ in range(args.runs):
+        elapsed, loaded = run_once()
+        timings.append(elapsed)
+        eager.update(loaded)
+
+    median = statistics.median(timings)
+    print(f"import server: median {median:.0f} ms, min {min(timings):.0f} ms over {args.runs} runs")
+    print(f"\n{'cumulative ms':>14}  module")
+    for cumulative, name in slowest_modules(args.top):
+        print(f"{cumulative / 1000:>14.1f}  {name}")
+
+    ok = True
+    if eager:
+        print(f"\nFAIL: imported at startup but should be deferred: {', '.join(sorted(eager))}")
+        ok = False
+    if args.max_ms is not None and median > args.max_ms:
+        print(f"\nFAIL: median {median:.0f} ms exceeds budget of {args.max_ms:.0f} ms")
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
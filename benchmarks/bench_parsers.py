@@ -0,0 +1,168 @@
+"""Parser benchmarks and golden-output check.
+
+    python benchmarks/bench_parsers.py                  # time, peak memory and retained blocks per parser/backend
+                                                        # ("stream" feeds the incremental parsers in 64 KiB chunks)
+    python benchmarks/bench_parsers.py --check          # compare outputs with benchmarks/golden, exit 1 on mismatch
+    python benchmarks/bench_parsers.py --update-golden  # rewrite golden outputs after an intended change
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydantic_core import to_jsonable_python
+
+import parsers.marks
+import parsers.soup
+from parsers.attendance import parse_attendance
+from parsers.marks import parse_marks
+from parsers.transcript import parse_transcript
+from parsers.courses import parse_courses
+from parsers.fees import parse_fee_report
+from parsers.challan import parse_challan
+from parsers.stream import streaming_parser
+from benchmarks.fixtures import FIXTURES, SCALE_UPS, load_fixture
+
+GOLDEN_DIR = Path(__file__).parent / "golden"
+# Chunk size the "stream" backend is fed in, about what httpx yields per read
+STREAM_CHUNK = 64 * 1024
+
+PARSERS: dict[str, Callable[[str], Any]] = {
+    "attendance": parse_attendance,
+    "marks": parse_marks,
+    "transcript": parse_transcript,
+    "courses": parse_courses,
+    "fees": parse_fee_report,
+    "challan": parse_challan,
+}
+
+
+def available_backends() -> list[str]:
+    backends = ["html.parser"]
+    try:
+        import lxml  # noqa: F401
+        backends.append("lxml")
+    except ImportError:
+        pass
+    return backends + ["stream"]
+
+
+def supports(backend: str, parser: Callable[[str], Any]) -> bool:
+    """"stream" is the incremental parser from parsers/stream.py, only some pages have one."""
+    return backend != "stream" or streaming_parser(parser) is not None
+
+
+def run_with_backend(backend: str, parser: Callable[[str], Any], html: str) -> Any:
+    if backend == "stream":
+        incremental = streaming_parser(parser)()
+        for start in range(0, len(html), STREAM_CHUNK):
+            incremental.feed(html[start:start + STREAM_CHUNK])
+        return incremental.close()
+    parsers.marks.clear_memo()  # Time cold parses, not pane memo hits
+    previous = parsers.soup.BACKEND
+    parsers.soup.BACKEND = backend
+    try:
+        return parser(html)
+    finally:
+        parsers.soup.BACKEND = previous
+
+
+def dump(result: Any) -> str:
+    return json.dumps(to_jsonable_python(result), indent=2, sort_keys=True) + "\n"
+
+
+def cases() -> list[tuple[str, str, str]]:
+    """(case name, parser name, html) for every committed fixture and scale-up."""
+    result = [(name, name, load_fixture(name)) for name in FIXTURES]
+    result += [(name, kind, build()) for name, (kind, build) in SCALE_UPS.items()]
+    return result
+
+
+def measure(backend: str, parser: Callable[[str], Any], html: str, repeat: int) -> dict:
+    run_with_backend(backend, parser, html)  # warm up imports and regex caches
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_with_backend(backend, parser, html)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    result = run_with_backend(backend, parser, html)
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    return {
+        "median_ms": statistics.median(timings) * 1000,
+        "min_ms": min(timings) * 1000,
+        "peak_kib": peak / 1024,
+        "retained_blocks": sum(stat.count for stat in snapshot.statistics("filename")),
+    }
+
+
+def benchmark(repeat: int, backends: list[str]) -> None:
+    print(f"{'case':<26} {'backend':<12} {'size KiB':>9} {'median ms':>10} {'min ms':>8} {'peak KiB':>9} {'blocks':>8}")
+    for name, kind, html in cases():
+        for backend in backends:
+            if not supports(backend, PARSERS[kind]):
+                continue
+            stats = measure(backend, PARSERS[kind], html, repeat)
+            print(f"{name:<26} {backend:<12} {len(html) / 1024:>9.1f} {stats['median_ms']:>10.2f} "
+                  f"{stats['min_ms']:>8.2f} {stats['peak_kib']:>9.0f} {stats['retained_blocks']:>8}")
+
+
+def check(backends: list[str]) -> bool:
+    """Every backend must reproduce the golden output and agree with the others on scale-ups."""
+    ok = True
+    for name, kind, html in cases():
+        golden_path = GOLDEN_DIR / f"{name}.json"
+        expected = golden_path.read_text(encoding="utf-8") if golden_path.exists() else None
+        for backend in backends:
+            if not supports(backend, PARSERS[kind]):
+                continue
+            actual = dump(run_with_backend(backend, PARSERS[kind], html))
+            if expected is None:
+                expected = actual
+            if actual != expected:
+                print(f"MISMATCH {name} ({backend})")
+                ok = False
+    print("golden check passed" if ok else "golden check FAILED")
+    return ok
+
+
+def update_golden() -> None:
+    GOLDEN_DIR.mkdir(exist_ok=True)
+    for name in FIXTURES:
+        result = run_with_backend("html.parser", PARSERS[name], load_fixture(name))
+        (GOLDEN_DIR / f"{name}.json").write_text(dump(result), encoding="utf-8")
+        print(f"wrote golden/{name}.json")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--backend", action="append", help="limit to a backend (repeatable)")
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--update-golden", action="store_true")
+    args = parser.parse_args()
+
+    backends = args.backend or available_backends()
+    if args.update_golden:
+        update_golden()
+        return 0
+    if args.check:
+        return 0 if check(backends) else 1
+    benchmark(args.repeat, backends)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""Anonymized FLEX portal pages for benchmarks and the golden-output check.
+
+The committed fixtures in benchmarks/fixtures/ are realistic single-semester
+pages; SCALE_UPS adds large synthetic pages generated on the fly.
+Regenerate the committed files with:
+
+    python benchmarks/fixtures.py
+"""
+import random
+from pathlib import Path
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+
+SUBJECTS = ["Data Structures", "Operating Systems", "Linear Algebra", "Computer Networks",
+            "Database Systems", "Software Engineering", "Artificial Intelligence", "Technical Writing"]
+
+
+MENU = ["Dashboard", "Course Registration", "Attendance", "Marks", "Transcript", "Fee Report",
+        "Feedback", "Study Plan", "Exam Schedule", "Grade Change", "Library", "Hostel"]
+
+
+def _boilerplate():
+    """Navigation, modals and inline scripts that real portal pages carry around the data."""
+    items = "\n".join(
+        f'<li class="m-menu__item" aria-haspopup="true"><a href="/Student/Page{i}?dump=tok{i:04d}" class="m-menu__link">'
+        f'<i class="m-menu__link-icon flaticon-{i}"></i><span class="m-menu__link-text">{MENU[i % len(MENU)]}</span></a></li>'
+        for i in range(120)
+    )
+    modals = "\n".join(
+        f'<div class="modal fade" id="modal{i}" tabindex="-1"><div class="modal-dialog"><div class="modal-content">'
+        f'<div class="modal-header"><h5 class="modal-title">Notice</h5></div><div class="modal-body"><p>{"Lorem ipsum dolor sit amet. " * 8}</p></div>'
+        f'</div></div></div>'
+        for i in range(4)
+    )
+    script = "\n".join(f"    var cfg{i} = {{ id: {i}, url: '/Student/Ajax{i}', retry: true }};" for i in range(200))
+    return f'<div class="m-aside-menu"><ul class="m-menu__nav">{items}</ul></div>\n{modals}\n<script>\n{script}\n</script>'
+
+
+def page(body, title="FLEX"):
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>{title}</title>
+<link rel="stylesheet" href="/Content/site.css">
+<script>var dump = "x"; if (a < b) {{ console.log("<h5>not a header</h5>"); }}</script>
+</head>
+<body class="m-page--fluid">
+<div class="m-grid m-grid--hor m-grid--root m-page">
+<header class="m-header"><a href="/Student/StudentAttendance?dump=abc123">Attendance</a>
+<a href="/Student/StudentMarks?dump=def456">Marks</a><img src="/logo.png" alt="logo"><br></header>
+{_boilerplate()}
+<div class="m-content">
+{body}
+</div>
+</div>
+<!-- footer -->
+</body></html>
+"""
+
+
+def attendance(courses=6, lectures=30, seed=1):
+    rnd = random.Random(seed)
+    parts = ['<div class="m-portlet"><div class="m-portlet__body">']
+    for c in range(courses):
+        code = f"CS{2001 + c}"
+        parts.append(f'<div class="tab-pane" id="c{c}"><h5>{code}-{SUBJECTS[c % len(SUBJECTS)]} (BCS-{c % 9}A)</h5>')
+        rows = []
+        present = 0
+        for n in range(1, lectures + 1):
+            p = "P" if rnd.random() > 0.15 else "A"
+            present += p == "P"
+            rows.append(f'<tr><td>{n}</td><td> {1 + n % 28:02d}-Sep-2025 </td><td>1.5</td><td class="text-center">{p}</td></tr>')
+        pct = present * 100 / lectures
+        parts.append(f'<div class="progress"><h5>{pct:.2f}%</h5></div>')
+        parts.append('<table class="table table-bordered"><thead><tr><th>Lecture No</th><th>Date</th><th>Duration (Hours)</th><th>Presence</th></tr></thead><tbody>')
+        parts.extend(rows)
+        parts.append('</tbody></table></div>')
+    parts.append('</div></div>')
+    return page("\n".join(parts), "Attendance")
+
+
+def marks(courses=6, items=4, seed=2):
+    rnd = random.Random(seed)
+    parts = ['<div class="tab-content">']
+    kinds = [("Assignment", 10), ("Quiz", 10), ("Sessional-I", 15), ("Sessional-II", 15), ("Final Exam", 50), ("Grand Total Marks", 100)]
+    for c in range(courses):
+        code = f"CS{2001 + c}"
+        parts.append(f'<div class="tab-pane fade{" active show" if c == 0 else ""}" id="m{c}" role="tabpanel">')
+        parts.append(f'<h5>{code}-{SUBJECTS[c % len(SUBJECTS)]}(BCS-{c % 9}A)</h5>')
+        if c == 1:
+            # Markup a tag counter must not take for real divs
+            parts.append('<!-- <div class="tab-pane"> --><span data-tpl="</div>"></span>'
+                         '<script>$(".card-body").append("</div></div>");</script>')
+        parts.append('<div class="accordion">')
+        for k, (kind, weight) in enumerate(kinds):
+            if kind == "Final Exam" and c % 2:
+                continue
+            parts.append(f'<div class="card"><div class="card-header"><button class="btn btn-link" type="button">{kind}</button></div>')
+            parts.append('<div class="collapse show"><div class="card-body"><table class="table"><thead><tr><th>#</th><th>Weightage</th><th>Obtained Marks</th><th>Total Marks</th><th>Average</th><th>Std Dev</th><th>Minimum</th><th>Maximum</th></tr></thead><tbody>')
+            tw = to = 0.0
+            n_items = 1 if weight >= 15 else items
+            for i in range(n_items):
+                w = round(weight / n_items, 2)
+                total = 20
+                got = None if (c == 3 and i == 0) else round(rnd.uniform(5, 20), 1)
+                obt = "-" if got is None else f"{got}"
+                parts.append(f'<tr class="calculationrow"><td>{i + 1}</td><td>{w}</td><td>{obt}</td><td>{total}</td><td>{rnd.uniform(8, 15):.2f}</td><td> {rnd.uniform(1, 4):.2f} </td><td>{rnd.uniform(0, 5):.1f}</td><td>{rnd.uniform(15, 20):.1f}</td></tr>')
+                tw += w
+                to += (got or 0) / total * w
+            parts.append(f'</tbody><tfoot><tr class="totalColumn_{k}"><td></td><td class="totalColweightage">{tw:.2f}</td><td class="totalColObtMarks">{to:.2f}</td><td></td></tr></tfoot></table></div></div></div>')
+        parts.append('</div></div>')
+    parts.append('</div>')
+    return page("\n".join(parts), "Marks")
+
+
+GRADES = [("A", "4.00"), ("A-", "3.67"), ("B+", "3.33"), ("B", "3.00"), ("B-", "2.67"), ("C+", "2.33"), ("C", "2.00"), ("F", "0.00")]
+
+
+def transcript(semesters=8, courses=5, seed=3):
+    rnd = random.Random(seed)
+    parts = ['<div class="m-portlet__body"><div class="row"><span>ARN: 1234567</span> <span>Roll No: 22F-0000</span> <span>Name: Test Student</span> <span>Batch: 2022</span></div>']
+    cg = 0.0
+    terms = ["Spring", "Summer", "Fall"]
+    parts.append('<div class="row">')
+    for s in range(semesters):
+        year = 2022 + (s + 2) // 3
+        term = terms[(s + 2) % 3]
+        sg = round(rnd.uniform(2.5, 4.0), 2)
+        cg = round((cg * s + sg) / (s + 1), 2)
+        parts.append(f'<div class="col-md-6"><div class="m-portlet"><h5>{term} {year}</h5>')
+        parts.append(f'<div class="pull-right"><span>Cr. Att: {courses * 3}</span> <span>Cr. Ernd: {courses * 3}</span> <span>CGPA: {cg:.2f}</span> <span>SGPA: {sg:.2f}</span></div>')
+        parts.append('<table class="table"><thead><tr><th>Code</th><th>Course Name</th><th>Section</th><th>Crd Hrs</th><th>Grade</th><th>Points</th><th>Type</th><th>Remarks</th></tr></thead><tbody>')
+        for c in range(courses):
+            grade, points = rnd.choice(GRADES)
+            code = f"{'CS' if c % 2 else 'MT'}{1000 + s * 10 + c}"
+            elective = c == courses - 1
+            cell = f'<a href="#" onclick="fn_StdGradeSchemeDetail({15202230000 + s * 100 + c})">{code}</a>' if elective else code
+            parts.append(f'<tr><td>{cell}</td><td>{SUBJECTS[(s + c) % len(SUBJECTS)]}</td><td>BCS-{s}A</td><td>3</td><td>{grade}</td><td>{points}</td><td>{"Elective" if elective else "Core"}</td><td></td></tr>')
+        parts.append('</tbody></table></div></div>')
+    parts.append('</div></div>')
+    return page("\n".join(parts), "Transcript")
+
+
+def courses(n=6):
+    rows = "\n".join(
+        f'<tr><td>CS{2001 + c}</td><td>{SUBJECTS[c % len(SUBJECTS)]}</td><td>BCS-{c % 9}A</td><td>3</td><td>Dr. Instructor {c}</td></tr>'
+        for c in range(n)
+    )
+    body = f'<table class="table"><thead><tr><th>Code</th><th>Title</th><th>Section</th><th>Credits</th><th>Instructor</th></tr></thead><tbody>{rows}</tbody></table>'
+    return page(body, "Course Registration")
+
+
+def fees(n=8, seed=4):
+    rnd = random.Random(seed)
+    heads = ["Sr", "Semester", "Challan No", "Instrument Type", "Instrument No", "Amount", "Due Date", "Payment Date", "Entered By", "Status"]
+    rows = "\n".join(
+        f'<tr><td>{i + 1}</td><td>Fall {2022 + i // 2}</td><td>{100000 + i}</td><td>Online</td><td>TX{rnd.randint(1000, 9999)}</td>'
+        f'<td>{rnd.randint(150, 250) * 1000:,}</td><td>15-Aug-{2022 + i // 2}</td><td>10-Aug-{2022 + i // 2}</td><td>bank</td><td>Paid</td></tr>'
+        for i in range(n)
+    )
+    body = (f'<table id="sample_CollectionDetail" class="table"><thead><tr>{"".join(f"<th>{h}</th>" for h in heads)}</tr></thead>'
+            f'<tbody>{rows}</tbody></table>')
+    return page(body, "Fee Report")
+
+
+def challan(challan_no=100007, heads=6, seed=5):
+    """Printable fee challan: the same voucher for bank, student and university."""
+    rnd = random.Random(seed)
+    names = ["Tuition Fee", "Registration Fee", "Library Fee", "Student Activity Fund",
+             "Examination Fee", "Transport Fee", "Late Payment Fine", "Lab Fee"]
+    items = [(names[i % len(names)], rnd.randint(1, 90) * 1000) for i in range(heads)]
+    total = sum(amount for _, amount in items)
+    rows = "".join(f'<tr><td>{i + 1}</td><td>{name}</td><td class="text-right">{amount:,}</td></tr>'
+                   for i, (name, amount) in enumerate(items))
+    copies = "".join(
+        f'<div class="challan-copy"><h4>{copy} Copy</h4>'
+        f'<table class="table"><tr><td>Challan No:</td><td>{challan_no}</td></tr>'
+        f'<tr><td>Roll No</td><td>22L-0000</td></tr><tr><td>Semester</td><td>Fall 2025</td></tr>'
+        f'<tr><td>Due Date</td><td>15-Aug-2025</td></tr><tr><td>Account No</td><td>0123456789</td></tr></table>'
+        f'<table class="table"><thead><tr><th>Sr</th><th>Description</th><th>Amount (Rs.)</th></tr></thead>'
+        f'<tbody>{rows}</tbody><tfoot><tr><td></td><td>Total Payable</td><td>Rs. {total:,}/-</td></tr></tfoot></table></div>'
+        for copy in ("Bank", "Student", "University")
+    )
+    return page(copies, "Fee Challan")
+
+
+# Realistic page sizes, written to FIXTURE_DIR
+FIXTURES = {
+    "attendance": lambda: attendance(courses=6, lectures=32),
+    "marks": lambda: marks(courses=6, items=4),
+    "transcript": lambda: transcript(semesters=6, courses=6),
+    "courses": lambda: courses(6),
+    "fees": lambda: fees(8),
+    "challan": lambda: challan(),
+}
+
+# Synthetic worst cases, generated in memory
+SCALE_UPS = {
+    "attendance_300_lectures": ("attendance", lambda: attendance(courses=7, lectures=300)),
+    "marks_8_courses": ("marks", lambda: marks(courses=8, items=10)),
+    "transcript_12_semesters": ("transcript", lambda: transcript(semesters=12, courses=7)),
+}
+
+
+def load_fixture(name: str) -> str:
+    return (FIXTURE_DIR / f"{name}.html").read_text(encoding="utf-8")
+
+
+if __name__ == "__main__":
+    FIXTURE_DIR.mkdir(exist_ok=True)
+    for name, build in FIXTURES.items():
+        (FIXTURE_DIR / f"{name}.html").write_text(build(), encoding="utf-8")
+        print(f"wrote {name}.html")
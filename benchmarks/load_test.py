@@ -0,0 +1,160 @@
+"""End-to-end load test: MCP tool calls against the local mock portal.
+
+    python benchmarks/load_test.py                                   # 200 calls, 8 at a time, default tool mix
+    python benchmarks/load_test.py --concurrency 32 --duration 30 --latency 150 --jitter 50
+    python benchmarks/load_test.py --tool get_marks --no-cache       # every call reaches the portal
+    python benchmarks/load_test.py --error-rate 0.05 --expire-after 5
+
+Starts benchmarks/mock_portal.py in-process (or uses --base-url), points the
+server at it with FLEX_BASE_URL and FLEX_INJECT_COOKIES, and drives the tools
+through an in-memory fastmcp.Client. Reports throughput and p50/p95/p99 per
+tool, and how many requests reached the portal. Other FLEX_* settings in the
+environment (cache, rate limit, streaming) apply as usual.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks import mock_portal
+
+# (tool, arguments) called round robin; "{semid}" is the current semester ID
+MIX = [
+    ("get_attendance", {}),
+    ("get_marks", {"semester_id": "{semid}"}),
+    ("get_transcript", {"fields": ["name", "sgpa", "cgpa"]}),
+    ("get_courses", {}),
+    ("get_fee_report", {}),
+    ("get_semester_snapshot", {"semester_id": "{semid}"}),
+    ("get_course_projections", {"semester_id": "{semid}"}),
+    ("get_mca", {"offer_id": "15202230005"}),
+]
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def summarize(name: str, samples: list[float], errors: int, elapsed: float) -> dict:
+    ordered = sorted(samples)
+    return {
+        "tool": name,
+        "calls": len(samples),
+        "errors": errors,
+        "per_second": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 1),
+    }
+
+
+async def run(calls: list[tuple[str, dict]], concurrency: int, requests: int,
+              duration: float | None) -> tuple[dict[str, list[float]], dict[str, int], float]:
+    from fastmcp import Client
+    import server
+
+    samples: dict[str, list[float]] = {name: [] for name, _ in calls}
+    errors: dict[str, int] = {name: 0 for name, _ in calls}
+    issued = 0
+
+    async with Client(server.mcp) as client:
+        start = time.perf_counter()
+        deadline = start + duration if duration else None
+
+        async def worker() -> None:
+            nonlocal issued
+            while True:
+                if deadline is not None:
+                    if time.perf_counter() >= deadline:
+                        return
+                elif issued >= requests:
+                    return
+                name, arguments = calls[issued % len(calls)]
+                issued += 1
+                began = time.perf_counter()
+                result = await client.call_tool(name, arguments, raise_on_error=False)
+                samples[name].append(time.perf_counter() - began)
+                content = result.structured_content or {}
+                if result.is_error or content.get("status") == "error":
+                    errors[name] += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return samples, errors, elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="total tool calls (ignored with --duration)")
+    parser.add_argument("--duration", type=float, help="seconds to keep calling instead of a fixed count")
+    parser.add_argument("--tool", action="append", help="limit the mix to a tool (repeatable)")
+    parser.add_argument("--base-url", help="an already running mock portal instead of starting one")
+    parser.add_argument("--latency", type=float, default=50, help="mock portal milliseconds per page")
+    parser.add_argument("--jitter", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--expire-after", type=float, help="seconds until a mock session expires")
+    parser.add_argument("--no-cache", action="store_true", help="disable the response cache for portal pages")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    portal = None
+    if args.base_url is None:
+        portal = mock_portal.start(
+            latency=args.latency / 1000, jitter=args.jitter / 1000, error_rate=args.error_rate,
+            expire_after=args.expire_after, seed=1,
+        )
+    # auth reads these at import, so set them before the server is loaded
+    os.environ["FLEX_BASE_URL"] = args.base_url or portal.url
+    os.environ.setdefault("FLEX_INJECT_COOKIES", json.dumps({"ASP.NET_SessionId": "{nonce}"}))
+    os.environ.setdefault("FLEX_ROLL_NO", "22L-0000")
+    os.environ.setdefault("FLEX_PASSWORD", "load-test")
+    os.environ.setdefault("FLEX_DATA_DIR", tempfile.mkdtemp(prefix="flex-load-"))
+    if args.no_cache:
+        os.environ["FLEX_CACHE_TTLS"] = ",".join(f"{path}=0" for path in mock_portal.PAGES)
+
+    from semesters import current_semester_id
+
+    semid = current_semester_id()
+    calls = [
+        (name, {k: v.replace("{semid}", semid) if isinstance(v, str) else v for k, v in arguments.items()})
+        for name, arguments in MIX
+        if not args.tool or name in args.tool
+    ]
+    if not calls:
+        parser.error(f"no such tool in the mix, choose from {', '.join(name for name, _ in MIX)}")
+
+    try:
+        samples, errors, elapsed = asyncio.run(run(calls, args.concurrency, args.requests, args.duration))
+    finally:
+        if portal is not None:
+            portal.shutdown()
+
+    rows = [summarize(name, samples[name], errors[name], elapsed) for name, _ in calls]
+    total = summarize("all", [s for values in samples.values() for s in values], sum(errors.values()), elapsed)
+    portal_requests = dict(portal.counts) if portal is not None else {}
+
+    if args.json:
+        print(json.dumps({"elapsed_s": round(elapsed, 2), "concurrency": args.concurrency,
+                          "tools": rows, "total": total, "portal_requests": portal_requests}, indent=2))
+        return 0
+
+    print(f"{total['calls']} calls in {elapsed:.2f}s at concurrency {args.concurrency}: "
+          f"{total['per_second']} calls/s, {total['errors']} errors")
+    print(f"{'tool':<26} {'calls':>6} {'errors':>6} {'calls/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for row in rows + [total]:
+        print(f"{row['tool']:<26} {row['calls']:>6} {row['errors']:>6} {row['per_second']:>8} "
+              f"{row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8}")
+    if portal_requests:
+        print("portal requests: " + ", ".join(f"{path} {n}" for path, n in sorted(portal_requests.items())))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""Local stand-in for the FLEX portal, serving the benchmark fixtures.
+
+    python benchmarks/mock_portal.py --port 8800 --latency 80 --error-rate 0.02 --expire-after 60
+
+Then run the server against it, with the login bypass instead of Chrome:
+
+    FLEX_BASE_URL=http://127.0.0.1:8800 FLEX_INJECT_COOKIES='{"ASP.NET_SessionId": "{nonce}"}' python server.py
+
+Any session cookie is accepted the first time it is seen and expires
+--expire-after seconds later, after which the portal redirects to /Login like
+the real one. GET /__stats returns request counts per path.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+
+PAGES = {
+    "/Student/StudentAttendance": "attendance",
+    "/Student/StudentMarks": "marks",
+    "/Student/Transcript": "transcript",
+    "/Student/CourseRegistration": "courses",
+    "/ConsolidatedFeeReport/ConsolidatedStdFeeReport": "fees",
+    "/Student/FeeChallan": "challan",
+}
+DASHBOARD = "<html><body>" + "".join(
+    f'<a href="{path}?dump=mock{i}">{name}</a>' for i, (path, name) in enumerate(PAGES.items())
+) + "</body></html>"
+# Carries the element ids auth looks for on the real login form
+LOGIN_PAGE = ('<html><body><form><input id="m_inputmask_4" name="username">'
+              '<button id="m_login_signin_submit">Sign In</button></form></body></html>')
+GRADE_SCHEMES = [
+    {"GS_TEXT": "A", "GRADING_FACTOR": 1.2},
+    {"GS_TEXT": "B", "GRADING_FACTOR": 0.6},
+    {"GS_TEXT": "C", "GRADING_FACTOR": 0},
+]
+
+
+class MockPortal(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503, expire_after: Optional[float] = None,
+                 cookie: str = "ASP.NET_SessionId", seed: Optional[int] = None):
+        super().__init__(address, PortalHandler)
+        self.pages = {path: (FIXTURE_DIR / f"{name}.html").read_bytes() for path, name in PAGES.items()}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.expire_after = expire_after
+        self.cookie = cookie
+        self.random = random.Random(seed)
+        self.sessions: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def session_valid(self, token: Optional[str]) -> bool:
+        if not token:
+            return False
+        with self.lock:
+            started = self.sessions.setdefault(token, time.monotonic())
+        return self.expire_after is None or time.monotonic() - started < self.expire_after
+
+    def delay(self) -> float:
+        with self.lock:
+            return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    def fails(self) -> bool:
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+    def count(self, path: str) -> None:
+        with self.lock:
+            self.counts[path] = self.counts.get(path, 0) + 1
+
+
+class PortalHandler(BaseHTTPRequestHandler):
+    server: MockPortal
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes = b"", content_type: str = "text/html; charset=utf-8",
+              headers: Optional[dict] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _token(self) -> Optional[str]:
+        for part in self.headers.get("Cookie", "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == self.server.cookie:
+                return value
+        return None
+
+    def _handle(self, method: str) -> None:
+        path = urlsplit(self.path).path
+        self.server.count(path)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+
+        if path == "/__stats":
+            return self._send(200, json.dumps(self.server.counts).encode(), "application/json")
+        if path == "/Login":
+            return self._send(200, LOGIN_PAGE.encode())
+
+        time.sleep(self.server.delay())
+        if not self.server.session_valid(self._token()):
+            return self._send(302, headers={"Location": "/Login"})
+        if self.server.fails():
+            return self._send(self.server.error_status, b"Service Unavailable", headers={"Retry-After": "1"})
+
+        if path == "/" and method == "GET":
+            return self._send(200, DASHBOARD.encode())
+        if path == "/Student/Populate_GradeSchemeDetails" and method == "POST":
+            return self._send(200, json.dumps(GRADE_SCHEMES).encode(), "application/json")
+        if path in self.server.pages and method == "GET":
+            return self._send(200, self.server.pages[path])
+        self._send(404, b"Not Found")
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+
+def start(port: int = 0, **options) -> MockPortal:
+    """Serve a mock portal from a background thread; call shutdown() on the result to stop it."""
+    portal = MockPortal(("127.0.0.1", port), **options)
+    threading.Thread(target=portal.serve_forever, daemon=True).start()
+    return portal
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--latency", type=float, default=0, help="milliseconds added to every page")
+    parser.add_argument("--jitter", type=float, default=0, help="+/- milliseconds of random latency")
+    parser.add_argument("--error-rate", type=float, default=0, help="share of requests that fail, 0 to 1")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--expire-after", type=float, help="seconds until a session expires")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    portal = MockPortal(
+        ("127.0.0.1", args.port), latency=args.latency / 1000, jitter=args.jitter / 1000,
+        error_rate=args.error_rate, error_status=args.error_status,
+        expire_after=args.expire_after, seed=args.seed,
+    )
+    print(f"Mock FLEX portal on {portal.url}")
+    try:
+        portal.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
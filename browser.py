@@ -0,0 +1,252 @@
+"""Chrome automation for the FLEX login page.
+
+Imported lazily by auth, only when a browser login is actually needed.
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException, TimeoutException, WebDriverException
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from auth import BASE_URL, DATA_DIR, _log
+from metrics import span
+
+DRIVER_CACHE_FILE = DATA_DIR / "chromedriver.json"
+CAPTCHA_TIMEOUT = 120  # 2 minutes for human to solve if needed
+
+HEADLESS = os.getenv("FLEX_BROWSER_HEADLESS", "").lower() in ("1", "true", "yes")
+PROFILE_DIR = os.getenv("FLEX_BROWSER_PROFILE_DIR")
+KEEP_ALIVE = os.getenv("FLEX_BROWSER_KEEP_ALIVE", "").lower() in ("1", "true", "yes")
+
+_driver: Optional[webdriver.Chrome] = None
+_driver_lock = threading.Lock()
+# Roll number the browser's portal cookies belong to, None until this process logs in.
+# A persistent profile keeps its cookies across restarts, so the owner is kept in it too.
+_logged_in_as: Optional[str] = None
+OWNER_FILE = Path(PROFILE_DIR).expanduser() / "flex_session_owner" if PROFILE_DIR else None
+
+
+def _session_owner() -> Optional[str]:
+    if _logged_in_as is None and OWNER_FILE:
+        try:
+            return OWNER_FILE.read_text(encoding="utf-8").strip() or None
+        except OSError:
+            return None
+    return _logged_in_as
+
+
+def _set_session_owner(roll_no: Optional[str]) -> None:
+    global _logged_in_as
+    _logged_in_as = roll_no
+    if not OWNER_FILE:
+        return
+    try:
+        if roll_no:
+            OWNER_FILE.parent.mkdir(parents=True, exist_ok=True)
+            OWNER_FILE.write_text(roll_no, encoding="utf-8")
+        else:
+            OWNER_FILE.unlink(missing_ok=True)
+    except OSError as e:
+        _log(f"Could not record the browser profile's account: {e}")
+
+
+def _find_chrome_binary() -> Optional[str]:
+    """Find Chrome binary path on Windows."""
+    if sys.platform != "win32":
+        return None  # Let Selenium find it on other platforms
+
+    # Common Chrome installation paths on Windows
+    possible_paths = [
+        os.path.expandvars(r"%ProgramFiles%\Google\Chrome\Application\chrome.exe"),
+        os.path.expandvars(r"%ProgramFiles(x86)%\Google\Chrome\Application\chrome.exe"),
+        os.path.expandvars(r"%LocalAppData%\Google\Chrome\Application\chrome.exe"),
+        r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+        r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+    ]
+
+    for path in possible_paths:
+        if os.path.exists(path):
+            _log(f"Found Chrome at: {path}")
+            return path
+
+    return None
+
+
+@lru_cache(maxsize=1)
+def resolve_chromedriver() -> str:
+    """Chromedriver path, resolved once and remembered across restarts.
+
+    FLEX_CHROMEDRIVER wins; otherwise the last path webdriver-manager returned is
+    reused while it still exists, so the network version check only runs once.
+    """
+    override = os.getenv("FLEX_CHROMEDRIVER")
+    if override:
+        return override
+
+    try:
+        cached = json.loads(DRIVER_CACHE_FILE.read_text(encoding="utf-8"))["path"]
+        if os.path.exists(cached):
+            return cached
+    except (OSError, ValueError, KeyError):
+        pass
+
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    os.environ['WDM_LOG_LEVEL'] = '0'
+    path = ChromeDriverManager().install()
+    try:
+        DRIVER_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        DRIVER_CACHE_FILE.write_text(json.dumps({"path": path}), encoding="utf-8")
+    except OSError as e:
+        _log(f"Could not cache chromedriver path: {e}")
+    return path
+
+
+def _build_options() -> webdriver.ChromeOptions:
+    options = webdriver.ChromeOptions()
+    options.add_argument("--start-maximized")
+    options.add_argument("--log-level=3")
+    options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
+    options.add_experimental_option("useAutomationExtension", False)
+
+    if HEADLESS:
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1280,900")
+    if PROFILE_DIR:
+        # A persistent profile keeps Google's reCAPTCHA cookies, so the checkbox often passes on its own
+        options.add_argument(f"--user-data-dir={Path(PROFILE_DIR).expanduser()}")
+
+    chrome_path = _find_chrome_binary()
+    if chrome_path:
+        options.binary_location = chrome_path
+    return options
+
+
+def _is_usable(driver: webdriver.Chrome) -> bool:
+    try:
+        driver.current_url
+        return True
+    except WebDriverException:
+        return False
+
+
+def _acquire_driver() -> webdriver.Chrome:
+    global _driver
+    if _driver is not None and _is_usable(_driver):
+        return _driver
+    try:
+        _driver = webdriver.Chrome(service=Service(resolve_chromedriver()), options=_build_options())
+    except SessionNotCreatedException:
+        if os.getenv("FLEX_CHROMEDRIVER"):
+            raise
+        # Usually Chrome updated itself past the remembered driver, resolve a matching one once
+        _log("Chromedriver does not match Chrome, resolving it again")
+        DRIVER_CACHE_FILE.unlink(missing_ok=True)
+        resolve_chromedriver.cache_clear()
+        _driver = webdriver.Chrome(service=Service(resolve_chromedriver()), options=_build_options())
+    return _driver
+
+
+def _release_driver(driver: webdriver.Chrome) -> None:
+    global _driver
+    if KEEP_ALIVE:
+        return
+    _driver = None
+    driver.quit()
+
+
+def shutdown() -> None:
+    """Quit a kept-alive browser."""
+    global _driver
+    with _driver_lock:
+        if _driver is not None:
+            _driver.quit()
+            _driver = None
+
+
+if KEEP_ALIVE:
+    atexit.register(shutdown)
+
+
+def _captcha_solved(driver: webdriver.Chrome) -> bool:
+    # g-recaptcha-response gets a value once the CAPTCHA is solved
+    return bool(driver.execute_script("return document.getElementById('g-recaptcha-response')?.value || '';"))
+
+
+def _session_state(driver: webdriver.Chrome) -> tuple[dict[str, str], str]:
+    cookies = {cookie["name"]: cookie["value"] for cookie in driver.get_cookies()}
+    return cookies, driver.page_source
+
+
+def browser_login(roll_no: str, password: str) -> tuple[dict[str, str], str]:
+    """Log in through Chrome and return (cookies, page source of the landing page)."""
+    with _driver_lock:
+        with span("login", phase="driver_start"):
+            driver = _acquire_driver()
+        try:
+            driver.get(f"{BASE_URL}/Login")
+
+            # A kept-alive browser may still hold a valid portal session, but only reuse it
+            # for the account that created it; anything else logs in from scratch
+            if "/Login" not in driver.current_url:
+                if _session_owner() == roll_no:
+                    return _session_state(driver)
+                driver.delete_all_cookies()
+                driver.get(f"{BASE_URL}/Login")
+            _set_session_owner(None)
+
+            username_field = WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.ID, "m_inputmask_4"))
+            )
+            password_field = driver.find_element(By.ID, "pass")
+
+            username_field.clear()
+            username_field.send_keys(roll_no)
+            password_field.clear()
+            password_field.send_keys(password)
+
+            WebDriverWait(driver, 10).until(
+                EC.frame_to_be_available_and_switch_to_it((By.CSS_SELECTOR, "iframe[src*='recaptcha']"))
+            )
+            checkbox = WebDriverWait(driver, 10).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, ".recaptcha-checkbox-border"))
+            )
+            checkbox.click()
+            driver.switch_to.default_content()
+
+            # Wait for CAPTCHA to be solved (either auto-pass or human solves image challenge)
+            _log("Waiting for CAPTCHA to be solved...")
+            if not HEADLESS:
+                _log("If an image challenge appears, please solve it manually.")
+            try:
+                with span("login", phase="captcha"):
+                    WebDriverWait(driver, CAPTCHA_TIMEOUT, poll_frequency=0.25,
+                                  ignored_exceptions=(WebDriverException,)).until(_captcha_solved)
+            except TimeoutException:
+                hint = " (image challenges cannot be solved headless, unset FLEX_BROWSER_HEADLESS)" if HEADLESS else ""
+                raise Exception(f"CAPTCHA was not solved within the timeout period{hint}")
+            _log("CAPTCHA solved successfully!")
+
+            sign_in_button = WebDriverWait(driver, 10).until(
+                EC.element_to_be_clickable((By.ID, "m_login_signin_submit"))
+            )
+            sign_in_button.click()
+
+            WebDriverWait(driver, 30).until(
+                lambda d: "/Login" not in d.current_url
+            )
+
+            _set_session_owner(roll_no)
+            return _session_state(driver)
+        finally:
+            _release_driver(driver)
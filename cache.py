@@ -0,0 +1,151 @@
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+# Seconds a cached page stays fresh, per endpoint. 0 disables caching for that endpoint.
+DEFAULT_TTLS = {
+    "/Student/Transcript": 6 * 60 * 60,
+    "/Student/CourseRegistration": 60 * 60,
+    "/ConsolidatedFeeReport/ConsolidatedStdFeeReport": 60 * 60,
+    "/Student/StudentMarks": 5 * 60,
+    "/Student/StudentAttendance": 5 * 60,
+}
+DEFAULT_TTL = 60
+
+CacheKey = tuple[str, str, str]
+
+
+@dataclass
+class CacheEntry:
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float
+
+    @property
+    def size(self) -> int:
+        return len(self.text)
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers for revalidating a stale entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """LRU cache of portal pages keyed on (path, semid, roll number)."""
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 32 * 1024 * 1024,
+                 ttls: Optional[dict[str, int]] = None, default_ttl: int = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self._entries: OrderedDict[CacheKey, CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """Build a cache from FLEX_CACHE_MAX_ENTRIES, FLEX_CACHE_MAX_MB and FLEX_CACHE_TTLS.
+
+        FLEX_CACHE_TTLS overrides endpoint TTLs, e.g. "/Student/Transcript=3600,/Student/StudentMarks=0".
+        """
+        ttls = dict(DEFAULT_TTLS)
+        for item in os.getenv("FLEX_CACHE_TTLS", "").split(","):
+            path, sep, seconds = item.partition("=")
+            if sep:
+                ttls[path.strip()] = int(seconds)
+        return cls(
+            max_entries=int(os.getenv("FLEX_CACHE_MAX_ENTRIES", "128")),
+            max_bytes=int(float(os.getenv("FLEX_CACHE_MAX_MB", "32")) * 1024 * 1024),
+            ttls=ttls,
+        )
+
+    @staticmethod
+    def key(path: str, roll_no: str) -> CacheKey:
+        parts = urlsplit(path)
+        semid = parse_qs(parts.query).get("semid", [""])[0]
+        return (parts.path, semid, roll_no)
+
+    def ttl_for(self, key: CacheKey) -> int:
+        return self.ttls.get(key[0], self.default_ttl)
+
+    def get(self, key: CacheKey) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        if entry.is_fresh():
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry
+
+    def put(self, key: CacheKey, text: str, etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> None:
+        ttl = self.ttl_for(key)
+        if ttl <= 0 or len(text) > self.max_bytes:
+            return
+        self._discard(key)
+        entry = CacheEntry(text, etag, last_modified, time.monotonic() + ttl)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        self._evict()
+
+    def refresh(self, key: CacheKey) -> None:
+        """Extend a stale entry after the portal answered 304 Not Modified."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.expires_at = time.monotonic() + self.ttl_for(key)
+            self.revalidated += 1
+
+    def invalidate(self, roll_no: Optional[str] = None) -> None:
+        for key in [k for k in self._entries if roll_no is None or k[2] == roll_no]:
+            self._discard(key)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+    def _discard(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self.evictions += 1
+
+
+_cache: Optional[ResponseCache] = None
+
+def get_cache() -> ResponseCache:
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache.from_env()
+    return _cache
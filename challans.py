@@ -0,0 +1,133 @@
+"""Fee challan documents, downloaded once into a content-addressed cache.
+
+Challans are streamed to disk in chunks, named by the sha256 of their bytes,
+so a large PDF is never held in memory and identical documents are stored
+once. index.json maps each roll number's challan numbers to their file, so
+asking for a challan again never touches the network.
+"""
+import asyncio
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from auth import DATA_DIR, FlexSession, LoginScan, SessionExpired
+
+# Portal URL of one challan, {challan_no} is filled in
+CHALLAN_PATH = os.getenv("FLEX_CHALLAN_PATH", "/Student/FeeChallan?challanNo={challan_no}")
+CHALLAN_DIR = Path(os.getenv("FLEX_CHALLAN_DIR", DATA_DIR / "challans")).expanduser()
+CHUNK_SIZE = 64 * 1024
+
+_EXTENSIONS = {"application/pdf": ".pdf", "text/html": ".html", "text/plain": ".txt"}
+
+
+class ChallanStore:
+    def __init__(self, root: Path = CHALLAN_DIR):
+        self.root = root
+        self.index_file = root / "index.json"
+        self._lock = threading.Lock()
+
+    def _read_index(self) -> dict:
+        try:
+            return json.loads(self.index_file.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def lookup(self, roll_no: str, challan_no: str) -> Optional[dict]:
+        """The cached file's entry, or None if it was never downloaded (or has been deleted)."""
+        with self._lock:
+            entry = self._read_index().get(roll_no, {}).get(challan_no)
+        if entry and (self.root / entry["file"]).exists():
+            return entry
+        return None
+
+    def _record(self, roll_no: str, challan_no: str, entry: dict) -> None:
+        with self._lock:
+            index = self._read_index()
+            index.setdefault(roll_no, {})[challan_no] = entry
+            partial = self.index_file.with_suffix(".tmp")
+            partial.write_text(json.dumps(index, indent=1), encoding="utf-8")
+            partial.replace(self.index_file)
+
+    def path(self, entry: dict) -> Path:
+        return self.root / entry["file"]
+
+    async def download(self, session: FlexSession, challan_no: str) -> dict:
+        """Stream a challan to disk, hashing it on the way, and index it under the session's roll number.
+        
+        An HTML answer is checked for the login form as it streams, so an expired
+        session is never stored as the challan; the download is retried once after
+        logging in again.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = CHALLAN_PATH.format(challan_no=challan_no)
+        partial = self.root / f".{uuid.uuid4().hex}.part"
+        try:
+            for attempt in range(2):
+                generation = session.generation
+                digest, size, expired = hashlib.sha256(), 0, False
+                async with session.stream(path) as response:
+                    response.raise_for_status()
+                    content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+                    # The markers are ASCII, so latin-1 finds them without decoding the page properly
+                    scan = LoginScan() if "html" in content_type else None
+                    with open(partial, "wb") as f:
+                        async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                            if scan and scan.found(chunk.decode("latin-1")):
+                                expired = True
+                                break
+                            digest.update(chunk)
+                            size += len(chunk)
+                            await asyncio.to_thread(f.write, chunk)
+                if not expired:
+                    break
+                if attempt:
+                    raise SessionExpired(f"Portal session expired while fetching challan {challan_no}")
+                await session.stream_expired(generation, path)
+            if not size:
+                raise ValueError(f"Portal returned an empty challan for {challan_no}")
+            name = digest.hexdigest() + _EXTENSIONS.get(content_type, ".bin")
+            target = self.root / name
+            if target.exists():
+                partial.unlink()  # Same bytes already stored
+            else:
+                partial.replace(target)
+        finally:
+            partial.unlink(missing_ok=True)
+
+        entry = {
+            "file": name,
+            "sha256": digest.hexdigest(),
+            "size": size,
+            "content_type": content_type,
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+        }
+        await asyncio.to_thread(self._record, session.roll_no, challan_no, entry)
+        return entry
+
+
+_store: Optional[ChallanStore] = None
+
+def get_challan_store() -> ChallanStore:
+    global _store
+    if _store is None:
+        _store = ChallanStore()
+    return _store
+
+
+def read_challan(path: Path, content_type: str):
+    """Parse a cached challan file. PDFs need pypdf for their text; returns None when it is missing."""
+    from parsers.challan import parse_challan, parse_challan_text
+
+    if content_type == "application/pdf" or path.suffix == ".pdf":
+        if importlib.util.find_spec("pypdf") is None:
+            return None
+        from pypdf import PdfReader
+
+        return parse_challan_text("\n".join(page.extract_text() or "" for page in PdfReader(path).pages))
+    return parse_challan(path.read_text(encoding="utf-8", errors="replace"))
@@ -0,0 +1,200 @@
+"""Grade arithmetic on parsed marks and transcripts.
+
+Pure functions, so tools can answer "what do I need in the final" or "what
+would my CGPA be" with a few numbers instead of the raw pages.
+"""
+from typing import Any, Optional, Union
+
+from parsers.models import MarksCourse, Transcript, TranscriptCourse
+
+# FAST grade points
+GRADE_POINTS = {
+    "A+": 4.0, "A": 4.0, "A-": 3.67,
+    "B+": 3.33, "B": 3.0, "B-": 2.67,
+    "C+": 2.33, "C": 2.0, "C-": 1.67,
+    "D+": 1.33, "D": 1.0,
+    "F": 0.0,
+}
+
+Scenario = dict[str, Union[str, dict[str, Any]]]
+
+
+def _round(value: Optional[float], digits: int = 2) -> Optional[float]:
+    return None if value is None else round(value, digits)
+
+
+def graded_weight(course: MarksCourse) -> float:
+    """Weightage of the assessments already marked.
+
+    Category totals include assessments not yet held, so count marked items
+    where there are any and fall back to category totals otherwise.
+    """
+    weight = 0.0
+    for assessment in course.assessments.values():
+        if assessment.items:
+            weight += sum(item.weightage or 0 for item in assessment.items if item.obtained_marks is not None)
+        elif assessment.total_obtained is not None:
+            weight += assessment.total_weightage or 0
+    return weight
+
+
+def class_average(course: MarksCourse) -> Optional[float]:
+    """Class average absolutes over the marked assessments, where the portal shows averages."""
+    total, seen = 0.0, False
+    for assessment in course.assessments.values():
+        for item in assessment.items:
+            if item.obtained_marks is None or item.average is None or not item.total_marks or item.weightage is None:
+                continue
+            total += item.average / item.total_marks * item.weightage
+            seen = True
+    return total if seen else None
+
+
+def course_projection(course: MarksCourse) -> dict:
+    """Absolutes so far, and where the course ends if the rest goes the same way."""
+    graded = min(graded_weight(course), 100.0)
+    obtained = course.total_obtained
+    remaining = 100.0 - graded
+    rate = obtained / graded if graded else None
+    return {
+        "course_code": course.course_code,
+        "obtained": _round(obtained),
+        "graded_weight": _round(graded),
+        "remaining_weight": _round(remaining),
+        "percent_so_far": _round(rate * 100 if rate is not None else None),
+        "class_average": _round(class_average(course)),
+        "projected_absolute": _round(obtained + remaining * rate if rate is not None else None),
+        "max_possible": _round(obtained + remaining),
+    }
+
+
+def required_marks(course: MarksCourse, target: float) -> dict:
+    """Marks needed in the unmarked assessments to finish the course on target absolutes."""
+    graded = min(graded_weight(course), 100.0)
+    remaining = 100.0 - graded
+    needed = max(0.0, target - course.total_obtained)
+    return {
+        "course_code": course.course_code,
+        "target": target,
+        "obtained": _round(course.total_obtained),
+        "remaining_weight": _round(remaining),
+        "needed": _round(needed),
+        # Share of every remaining mark that has to be scored
+        "needed_percent_of_remaining": _round(needed / remaining * 100) if remaining else None,
+        "achievable": needed <= remaining,
+        "already_met": needed == 0,
+    }
+
+
+def _points(course: TranscriptCourse) -> Optional[float]:
+    """Grade points the transcript gives a course, or None for grades that do not count (I, W, S...).
+
+    The portal's Points column wins where it parses; GRADE_POINTS only fills in
+    when it is blank and prices what-if grades.
+    """
+    grade = course.grade.strip()
+    if grade not in GRADE_POINTS:
+        return None
+    try:
+        return float(course.points)
+    except ValueError:
+        return GRADE_POINTS[grade]
+
+
+def _credits(course: TranscriptCourse) -> float:
+    try:
+        return float(course.credit_hours)
+    except ValueError:
+        return 0.0
+
+
+def gpa_scenarios(transcript: Transcript, scenarios: list[Scenario], semester: Optional[str] = None) -> dict:
+    """SGPA and CGPA for each scenario of grades by course code.
+
+    A scenario maps course codes to a grade ("B+") or {"grade": ..., "credits": ...}
+    for courses not on the transcript. Courses are placed in the target semester:
+    the latest one by default, a semester by name, or "next" for a new semester
+    after the transcript. A course code seen in an earlier semester is treated as
+    a repeat, replacing the earlier attempt in the CGPA. The baseline is computed
+    once and each scenario only adjusts it.
+    """
+    if not transcript.semesters:
+        raise ValueError("Transcript has no semesters")
+    if semester == "next":
+        before, target_name, target_courses = transcript.semesters, "next", []
+    else:
+        index = len(transcript.semesters) - 1
+        if semester:
+            names = [term.name for term in transcript.semesters]
+            if semester not in names:
+                raise ValueError(f"No semester named {semester!r} in the transcript")
+            index = names.index(semester)
+        before = transcript.semesters[:index]
+        target_name, target_courses = transcript.semesters[index].name, transcript.semesters[index].courses
+
+    # Latest graded attempt per course code, before the target semester
+    earlier: dict[str, tuple[float, float]] = {}
+    for term in before:
+        for course in term.courses:
+            points = _points(course)
+            if points is not None:
+                earlier[course.code] = (points, _credits(course))
+    term_courses = {course.code: course for course in target_courses}
+    term_graded = {
+        code: (_points(course), _credits(course))
+        for code, course in term_courses.items()
+        if _points(course) is not None
+    }
+
+    # Baseline sums, so each scenario only adjusts the courses it names
+    overall = {**earlier, **term_graded}
+    base_points = sum(points * credits for points, credits in overall.values())
+    base_credits = sum(credits for _, credits in overall.values())
+    term_points = sum(points * credits for points, credits in term_graded.values())
+    term_credits = sum(credits for _, credits in term_graded.values())
+
+    def evaluate(scenario: Scenario) -> dict:
+        points_total, credits_total = base_points, base_credits
+        sem_points, sem_credits = term_points, term_credits
+        grades = {}
+        for code, value in scenario.items():
+            grade = value if isinstance(value, str) else value.get("grade", "")
+            if grade not in GRADE_POINTS:
+                raise ValueError(f"Unknown grade {grade!r} for {code}")
+            if isinstance(value, dict) and "credits" in value:
+                credits = float(value["credits"])
+            elif code in term_courses:
+                credits = _credits(term_courses[code])
+            elif code in earlier:
+                credits = earlier[code][1]
+            else:
+                raise ValueError(f"{code} is not on the transcript, give its credits")
+            if code in overall:
+                # Replaces the grade already counted (this semester's, or an earlier attempt)
+                old_points, old_credits = overall[code]
+                points_total -= old_points * old_credits
+                credits_total -= old_credits
+            if code in term_graded:
+                old_points, old_credits = term_graded[code]
+                sem_points -= old_points * old_credits
+                sem_credits -= old_credits
+            points = GRADE_POINTS[grade]
+            points_total += points * credits
+            credits_total += credits
+            sem_points += points * credits
+            sem_credits += credits
+            grades[code] = grade
+
+        return {
+            "grades": grades,
+            "sgpa": _round(sem_points / sem_credits if sem_credits else None),
+            "cgpa": _round(points_total / credits_total if credits_total else None),
+            "credits": credits_total,
+        }
+
+    return {
+        "semester": target_name,
+        "current_cgpa": transcript.cgpa,
+        "pending": [course.code for course in target_courses if _points(course) is None],
+        "scenarios": [evaluate(scenario) for scenario in scenarios],
+    }
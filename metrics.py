@@ -0,0 +1,189 @@
+"""In-process latency histograms and counters for tools, login, fetch and parse.
+
+    with span("fetch", endpoint="/Student/Transcript"):
+        ...
+
+Spans are aggregated per name and label set. get_server_metrics reports them
+as p50/p95/p99 or in the Prometheus text format.
+"""
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+from fastmcp.server.middleware import Middleware
+
+# Histogram bucket upper bounds in seconds, up to the two minute CAPTCHA wait
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# Most recent samples kept per histogram for percentiles
+RESERVOIR_SIZE = 1024
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.samples: deque[float] = deque(maxlen=RESERVOIR_SIZE)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.sum += seconds
+        self.samples.append(seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self) -> dict:
+        def ms(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value * 1000, 2)
+
+        return {
+            "count": self.count,
+            "mean_ms": ms(self.sum / self.count) if self.count else None,
+            "p50_ms": ms(self.percentile(0.50)),
+            "p95_ms": ms(self.percentile(0.95)),
+            "p99_ms": ms(self.percentile(0.99)),
+        }
+
+
+class Metrics:
+    def __init__(self):
+        self.histograms: dict[tuple[str, Labels], Histogram] = {}
+        self.counters: dict[tuple[str, Labels], float] = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _labels(labels: dict[str, Any]) -> Labels:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        key = (name, self._labels(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = (name, self._labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            spans: dict[str, list] = {}
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                spans.setdefault(name, []).append({**dict(labels), **histogram.summary()})
+            counters: dict[str, list] = {}
+            for (name, labels), value in sorted(self.counters.items()):
+                counters.setdefault(name, []).append({**dict(labels), "value": value})
+        return {"uptime_seconds": round(time.time() - self.started, 1), "spans": spans, "counters": counters}
+
+    def prometheus(self, gauges: Optional[dict[str, float]] = None) -> str:
+        """Histograms, counters and extra gauges in the Prometheus text exposition format."""
+        def fmt(labels: Labels, extra: str = "") -> str:
+            parts = [f'{k}="{v}"' for k, v in labels] + ([extra] if extra else [])
+            return "{" + ",".join(parts) + "}" if parts else ""
+
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self.histograms}):
+                metric = f"flex_{name}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                for (other, labels), histogram in sorted(self.histograms.items()):
+                    if other != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip((*BUCKETS, "+Inf"), histogram.counts):
+                        cumulative += count
+                        le = f'le="{bound}"'
+                        lines.append(f"{metric}_bucket{fmt(labels, le)} {cumulative}")
+                    lines.append(f"{metric}_sum{fmt(labels)} {histogram.sum:.6f}")
+                    lines.append(f"{metric}_count{fmt(labels)} {histogram.count}")
+            for name in sorted({name for name, _ in self.counters}):
+                metric = f"flex_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for (other, labels), value in sorted(self.counters.items()):
+                    if other == name:
+                        lines.append(f"{metric}{fmt(labels)} {value:g}")
+        for name, value in (gauges or {}).items():
+            lines.append(f"# TYPE flex_{name} gauge")
+            lines.append(f"flex_{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+_metrics = Metrics()
+
+def get_metrics() -> Metrics:
+    return _metrics
+
+
+# Seconds spent in the tool body of the current tool call, set by timed_tool
+_body_seconds: ContextVar[Optional[list[float]]] = ContextVar("flex_tool_body", default=None)
+
+
+@contextmanager
+def span(name: str, **labels: Any) -> Iterator[None]:
+    """Time the block into the histogram for name and labels, even if it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _metrics.observe(name, time.perf_counter() - start, **labels)
+
+
+def timed_tool(fn):
+    """Time a tool's body so MetricsMiddleware can tell it apart from result serialization."""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            _metrics.observe("tool_body", elapsed, tool=fn.__name__)
+            body = _body_seconds.get()
+            if body is not None:
+                body.append(elapsed)
+    return wrapper
+
+
+class MetricsMiddleware(Middleware):
+    """Time every tool call end to end, and the serialization of its result."""
+
+    async def on_call_tool(self, context, call_next):
+        tool = context.message.name
+        body: list[float] = []
+        token = _body_seconds.set(body)
+        start = time.perf_counter()
+        try:
+            result = await call_next(context)
+            # Tools report failures in the result rather than raising
+            if isinstance(result.structured_content, dict) and result.structured_content.get("status") == "error":
+                _metrics.inc("tool_errors", tool=tool)
+            return result
+        except Exception:
+            _metrics.inc("tool_errors", tool=tool)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            _body_seconds.reset(token)
+            _metrics.observe("tool", elapsed, tool=tool)
+            _metrics.inc("tool_calls", tool=tool)
+            if body:
+                _metrics.observe("serialize", max(0.0, elapsed - sum(body)), tool=tool)
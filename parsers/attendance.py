@@ -1,12 +1,27 @@
-from typing import Any
-from bs4 import BeautifulSoup
-import re
+from dataclasses import replace
+from typing import Optional
+from bs4 import SoupStrainer
+from parsers.models import AttendanceCourse, AttendanceReport, Lecture
+from parsers.patterns import COURSE_HEADER_PREFIX, PERCENTAGE, parse_course_header
+from parsers.soup import make_soup
 
+# Course headers, percentages and lecture tables are all the parser looks at
+_STRAINER = SoupStrainer(["h5", "table"])
 
-def parse_attendance(html: str) -> dict[str, Any]:
-    soup = BeautifulSoup(html, "html.parser")
+
+def _wanted(code: str, course_code: Optional[str]) -> bool:
+    return not course_code or code.lower() == course_code.lower()
+
+
+def parse_attendance(html: str, course_code: Optional[str] = None, lectures: bool = True) -> AttendanceReport:
+    """Parse the attendance page.
     
-    result = {"courses": []}
+    course_code keeps only that course and lectures=False skips the lecture rows,
+    so filtered-out rows are never built.
+    """
+    soup = make_soup(html, _STRAINER)
+    
+    result = AttendanceReport()
     
     all_h5 = soup.find_all("h5")
     course_headers = []
@@ -14,9 +29,9 @@ def parse_attendance(html: str) -> dict[str, Any]:
     
     for h5 in all_h5:
         text = h5.get_text(strip=True)
-        if re.match(r"[A-Z]{2}\d+-.+", text):
+        if COURSE_HEADER_PREFIX.match(text):
             course_headers.append(text)
-        elif re.match(r"\d+\.\d+%", text):
+        elif PERCENTAGE.match(text):
             percentages.append(text)
     
     tables = soup.find_all("table")
@@ -31,26 +46,28 @@ def parse_attendance(html: str) -> dict[str, Any]:
         course_name = course_headers[i] if i < len(course_headers) else f"Course {i+1}"
         percentage = percentages[i] if i < len(percentages) else None
         
-        course_match = re.match(r"([A-Z]{2}\d+)-(.+?)\s*\(([^)]+)\)", course_name)
+        code, name, section = parse_course_header(course_name) or ("", course_name, "")
+        if not _wanted(code, course_code):
+            continue
         
-        course_data = {
-            "course_code": course_match.group(1) if course_match else "",
-            "course_name": course_match.group(2).strip() if course_match else course_name,
-            "section": course_match.group(3) if course_match else "",
-            "attendance_percentage": percentage,
-            "lectures": []
-        }
+        course_data = AttendanceCourse(code, name, section, percentage)
         
-        for row in table.find_all("tr"):
-            cols = [td.get_text(strip=True) for td in row.find_all("td")]
-            if len(cols) >= 4:
-                course_data["lectures"].append({
-                    "lecture_no": cols[0],
-                    "date": cols[1],
-                    "duration_hours": cols[2],
-                    "presence": cols[3]
-                })
+        if lectures:
+            for row in table.find_all("tr"):
+                cols = [td.get_text(strip=True) for td in row.find_all("td")]
+                if len(cols) >= 4:
+                    course_data.lectures.append(Lecture(cols[0], cols[1], cols[2], cols[3]))
         
-        result["courses"].append(course_data)
+        result.courses.append(course_data)
     
     return result
+
+
+def filter_attendance(report: AttendanceReport, course_code: Optional[str] = None,
+                      lectures: bool = True) -> AttendanceReport:
+    """The same filters as parse_attendance, applied to an already parsed report."""
+    return AttendanceReport([
+        course if lectures else replace(course, lectures=[])
+        for course in report.courses
+        if _wanted(course.course_code, course_code)
+    ])
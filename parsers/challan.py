@@ -1,6 +1,78 @@
-from typing import Any
-from parsers.fees import parse_fee_report
+import re
+from typing import Optional
+from parsers.models import Challan, ChallanItem
+from parsers.patterns import (
+    CHALLAN_AMOUNT, CHALLAN_DETAIL_LABEL, CHALLAN_DUE_LABEL, CHALLAN_NO_LABEL, CHALLAN_TOTAL_LABEL
+)
+from parsers.soup import make_soup
 
 
-def parse_challan(html: str) -> dict[str, Any]:
-    return parse_fee_report(html)
+def parse_challan(html: str) -> Challan:
+    """Parse a printable fee challan: challan number, due date, fee heads and total.
+    
+    Challans usually print the same voucher for the bank, the student and the
+    university; only the first copy is read.
+    """
+    soup = make_soup(html)
+    rows = []
+    for tr in soup.find_all("tr"):
+        cells = [cell.get_text(" ", strip=True) for cell in tr.find_all(["td", "th"])]
+        rows.append([cell for cell in cells if cell])
+    if not any(rows):
+        return parse_challan_text(soup.get_text("\n"))
+    return _from_rows(rows)
+
+
+def parse_challan_text(text: str) -> Challan:
+    """Parse a challan from plain text (e.g. extracted from a PDF), one label and value per line."""
+    rows = [
+        [part for part in re.split(r"\s{2,}|\t|:\s*", line.strip()) if part]
+        for line in text.splitlines()
+    ]
+    return _from_rows(rows)
+
+
+def _amount(value: str) -> Optional[float]:
+    match = CHALLAN_AMOUNT.match(value.strip())
+    return float(match.group(1).replace(",", "")) if match else None
+
+
+def _labelled(cells: list[str], label: re.Pattern) -> Optional[str]:
+    """Value after a label, in the same cell ("Due Date: 15-Aug-2025") or the next one."""
+    for i, cell in enumerate(cells):
+        match = label.search(cell)
+        if not match:
+            continue
+        rest = cell[match.end():].lstrip(" .:#-")
+        if rest:
+            return rest
+        if i + 1 < len(cells):
+            return cells[i + 1]
+    return None
+
+
+def _from_rows(rows: list[list[str]]) -> Challan:
+    result = Challan()
+    for cells in rows:
+        if not cells:
+            continue
+        if not result.challan_no:
+            result.challan_no = _labelled(cells, CHALLAN_NO_LABEL) or ""
+        if not result.due_date:
+            result.due_date = _labelled(cells, CHALLAN_DUE_LABEL) or ""
+        if result.amount is not None:
+            continue  # Past the first copy's total, only details are still missing
+        
+        amount = _amount(cells[-1])
+        # Description is the first cell with letters, skipping serial numbers
+        description = next((cell for cell in cells[:-1] if re.search(r"[A-Za-z]", cell)), None)
+        if amount is None or description is None:
+            continue
+        if CHALLAN_TOTAL_LABEL.search(description):
+            result.amount = amount
+        elif not CHALLAN_DETAIL_LABEL.search(description):
+            result.breakdown.append(ChallanItem(description, amount))
+    
+    if result.amount is None and result.breakdown:
+        result.amount = sum(item.amount or 0 for item in result.breakdown)
+    return result
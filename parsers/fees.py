@@ -1,11 +1,15 @@
-from typing import Any
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
+from parsers.models import FeeReport, Payment
+from parsers.soup import make_soup
 
+# sample_CollectionDetail, or any table as a fallback when the id is missing
+_STRAINER = SoupStrainer("table")
 
-def parse_fee_report(html: str) -> dict[str, Any]:
-    soup = BeautifulSoup(html, "html.parser")
+
+def parse_fee_report(html: str) -> FeeReport:
+    soup = make_soup(html, _STRAINER)
     
-    result = {"payments": []}
+    result = FeeReport()
     
     # Try to find by specific ID first
     table = soup.find("table", id="sample_CollectionDetail")
@@ -27,17 +31,6 @@ def parse_fee_report(html: str) -> dict[str, Any]:
         for row in rows:
             cols = [td.get_text(strip=True) for td in row.find_all("td")]
             if len(cols) >= 10:
-                result["payments"].append({
-                    "sr_no": cols[0],
-                    "semester": cols[1],
-                    "challan_no": cols[2],
-                    "instrument_type": cols[3],
-                    "instrument_no": cols[4],
-                    "amount": cols[5],
-                    "due_date": cols[6],
-                    "payment_date": cols[7],
-                    "entered_by": cols[8],
-                    "status": cols[9]
-                })
+                result.payments.append(Payment(*cols[:10]))
     
     return result
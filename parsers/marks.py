@@ -1,106 +1,176 @@
-from typing import Any
-from bs4 import BeautifulSoup
-import re
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+from bs4 import SoupStrainer
+from parsers.models import Assessment, AssessmentItem, MarksCourse, MarksReport
+from parsers.patterns import HTML_TOKEN, TAB_PANE_START, TOTAL_ROW_CLASS, parse_course_header
+from parsers import soup as soup_backend
+from parsers.soup import has_class, make_soup
 
+_STRAINER = SoupStrainer("div", class_=has_class("tab-pane"))
 
-def parse_marks(html: str) -> dict[str, Any]:
-    """Parse marks page HTML with tab-pane and card structure."""
-    soup = BeautifulSoup(html, "html.parser")
+# Parsed courses by pane fingerprint, so panes unchanged since the last poll are not reparsed
+MEMO_SIZE = int(os.getenv("FLEX_MARKS_MEMO", "256"))
+_memo: OrderedDict[tuple[str, bytes], Optional[MarksCourse]] = OrderedDict()
+_memo_lock = threading.Lock()
+_memo_hits = 0
+_memo_misses = 0
+
+
+def _panes(html: str) -> list[str]:
+    """Raw markup of each tab-pane div, found by matching up div tags instead of parsing.
+    
+    Tags inside comments, scripts, styles and attribute values are skipped. A
+    pane left open at the end of the page means the markup was not understood,
+    so nothing is returned and the caller parses the whole page.
+    """
+    panes, open_panes, depth = [], [], 0
+    for token in HTML_TOKEN.finditer(html):
+        name = token.group(3)
+        if not name or name.lower() != "div":
+            continue
+        if token.group(2):
+            depth = max(depth - 1, 0)
+            if open_panes and open_panes[-1][1] == depth:
+                panes.append((open_panes.pop()[0], token.end()))
+        else:
+            if TAB_PANE_START.match(token.group(0)):
+                open_panes.append((token.start(), depth))
+            depth += 1
+    if open_panes:
+        return []
+    return [html[start:end] for start, end in sorted(panes)]
+
+
+def parse_marks(html: str) -> MarksReport:
+    """Parse marks page HTML with tab-pane and card structure.
+    
+    Each pane is fingerprinted by its raw markup and only panes not seen
+    before are parsed; the rest come from a memo of FLEX_MARKS_MEMO courses
+    (0 disables it). Memoized courses are shared between results, so treat
+    them as read-only.
+    """
+    global _memo_hits, _memo_misses
+    panes = _panes(html)
+    if not panes:
+        # Markup the slicer does not recognise, parse the whole page
+        soup = make_soup(html, _STRAINER)
+        courses = [_parse_pane(pane) for pane in soup.find_all("div", class_="tab-pane")]
+        return MarksReport([course for course in courses if course])
+    
+    result = MarksReport()
+    for markup in panes:
+        digest = (soup_backend.BACKEND, hashlib.blake2b(markup.encode(), digest_size=16).digest())
+        with _memo_lock:
+            hit = digest in _memo
+            if hit:
+                _memo.move_to_end(digest)
+                course = _memo[digest]
+                _memo_hits += 1
+        if not hit:
+            pane = make_soup(markup, _STRAINER).find("div", class_="tab-pane")
+            course = _parse_pane(pane) if pane else None
+            with _memo_lock:
+                _memo_misses += 1
+                if MEMO_SIZE > 0:
+                    _memo[digest] = course
+                    while len(_memo) > MEMO_SIZE:
+                        _memo.popitem(last=False)
+        if course:
+            result.courses.append(course)
     
-    result = {"courses": []}
+    return result
+
+
+def memo_stats() -> dict:
+    with _memo_lock:
+        return {"entries": len(_memo), "max_entries": MEMO_SIZE, "hits": _memo_hits, "misses": _memo_misses}
+
+
+def clear_memo() -> None:
+    with _memo_lock:
+        _memo.clear()
+
+
+def _parse_pane(pane) -> Optional[MarksCourse]:
+    """One course from its tab-pane, or None if the pane is not a course with assessments."""
+    course_header = pane.find("h5")
+    if not course_header:
+        return None
+        
+    header = parse_course_header(course_header.get_text(strip=True))
     
-    tab_panes = soup.find_all("div", class_="tab-pane")
+    if not header:
+        return None
+        
+    code, name, section = header
+    course_data = MarksCourse(code, name, section)
+        
+    cards = pane.find_all("div", class_="card")
     
-    for pane in tab_panes:
-        course_header = pane.find("h5")
-        if not course_header:
+    for card in cards:
+        button = card.find("button")
+        if not button:
             continue
             
-        header_text = course_header.get_text(strip=True)
-        course_match = re.match(r"([A-Z]{2}\d+)-(.+?)\s*\(([^)]+)\)", header_text)
+        assessment_type = button.get_text(strip=True)
         
-        if not course_match:
+        if "Grand Total" in assessment_type:
+            continue
+        
+        table = card.find("table")
+        if not table:
             continue
-            
-        course_data = {
-            "course_code": course_match.group(1),
-            "course_name": course_match.group(2).strip(),
-            "section": course_match.group(3),
-            "assessments": {},
-            "total_obtained": 0.0,
-            "total_weightage": 0.0
-        }
         
-        cards = pane.find_all("div", class_="card")
+        assessment_data = Assessment()
         
-        for card in cards:
-            button = card.find("button")
-            if not button:
-                continue
+        # Parse data rows (class="calculationrow")
+        for row in table.find_all("tr", class_="calculationrow"):
+            cols = [td.get_text(strip=True) for td in row.find_all("td")]
+            if len(cols) >= 4:
+                # Handle "-" for missing marks
+                obtained = cols[2] if cols[2] != "-" else None
                 
-            assessment_type = button.get_text(strip=True)
-            
-            if "Grand Total" in assessment_type:
-                continue
-            
-            table = card.find("table")
-            if not table:
-                continue
-            
-            assessment_data = {
-                "items": [],
-                "total_weightage": None,
-                "total_obtained": None
-            }
-            
-            # Parse data rows (class="calculationrow")
-            for row in table.find_all("tr", class_="calculationrow"):
-                cols = [td.get_text(strip=True) for td in row.find_all("td")]
-                if len(cols) >= 4:
-                    # Handle "-" for missing marks
-                    obtained = cols[2] if cols[2] != "-" else None
-                    
-                    assessment_data["items"].append({
-                        "number": cols[0],
-                        "weightage": _parse_float(cols[1]),
-                        "obtained_marks": _parse_float(obtained) if obtained else None,
-                        "total_marks": _parse_float(cols[3]),
-                        "average": _parse_float(cols[4]) if len(cols) > 4 else None,
-                        "std_dev": cols[5].strip() if len(cols) > 5 and cols[5].strip() else None,
-                        "min": _parse_float(cols[6]) if len(cols) > 6 else None,
-                        "max": _parse_float(cols[7]) if len(cols) > 7 else None
-                    })
-            
-            # Parse total row (has totalCol* classes)
-            total_row = table.find("tr", class_=re.compile(r"totalColumn"))
-            if not total_row:
-                # Also check tfoot
-                tfoot = table.find("tfoot")
-                if tfoot:
-                    total_row = tfoot.find("tr")
+                assessment_data.items.append(AssessmentItem(
+                    number=cols[0],
+                    weightage=_parse_float(cols[1]),
+                    obtained_marks=_parse_float(obtained) if obtained else None,
+                    total_marks=_parse_float(cols[3]),
+                    average=_parse_float(cols[4]) if len(cols) > 4 else None,
+                    std_dev=cols[5].strip() if len(cols) > 5 and cols[5].strip() else None,
+                    min=_parse_float(cols[6]) if len(cols) > 6 else None,
+                    max=_parse_float(cols[7]) if len(cols) > 7 else None
+                ))
+        
+        # Parse total row (has totalCol* classes)
+        total_row = table.find("tr", class_=TOTAL_ROW_CLASS)
+        if not total_row:
+            # Also check tfoot
+            tfoot = table.find("tfoot")
+            if tfoot:
+                total_row = tfoot.find("tr")
+        
+        if total_row:
+            weightage_td = total_row.find("td", class_="totalColweightage")
+            obtained_td = total_row.find("td", class_="totalColObtMarks")
             
-            if total_row:
-                weightage_td = total_row.find("td", class_="totalColweightage")
-                obtained_td = total_row.find("td", class_="totalColObtMarks")
+            if weightage_td:
+                assessment_data.total_weightage = _parse_float(weightage_td.get_text(strip=True))
+            if obtained_td:
+                assessment_data.total_obtained = _parse_float(obtained_td.get_text(strip=True))
                 
-                if weightage_td:
-                    assessment_data["total_weightage"] = _parse_float(weightage_td.get_text(strip=True))
-                if obtained_td:
-                    assessment_data["total_obtained"] = _parse_float(obtained_td.get_text(strip=True))
-                    
-                # Add to course totals
-                if assessment_data["total_weightage"]:
-                    course_data["total_weightage"] += assessment_data["total_weightage"]
-                if assessment_data["total_obtained"]:
-                    course_data["total_obtained"] += assessment_data["total_obtained"]
-            
-            if assessment_data["items"]:
-                course_data["assessments"][assessment_type] = assessment_data
+            # Add to course totals
+            if assessment_data.total_weightage:
+                course_data.total_weightage += assessment_data.total_weightage
+            if assessment_data.total_obtained:
+                course_data.total_obtained += assessment_data.total_obtained
         
-        if course_data["assessments"]:
-            result["courses"].append(course_data)
+        if assessment_data.items:
+            course_data.assessments[assessment_type] = assessment_data
     
-    return result
+    return course_data if course_data.assessments else None
 
 
 def _parse_float(value: str) -> float | None:
@@ -0,0 +1,180 @@
+"""Typed parser results.
+
+Slotted dataclasses keep per-row memory small (no per-instance __dict__ and no
+repeated key strings). FastMCP serializes them directly, field by field, so the
+JSON sent to clients is the same as the dicts the parsers used to build.
+"""
+from dataclasses import dataclass, field, fields, is_dataclass
+from typing import Any, Optional, Union, get_args, get_origin, get_type_hints
+
+
+@dataclass(slots=True)
+class Lecture:
+    lecture_no: str
+    date: str
+    duration_hours: str
+    presence: str
+
+
+@dataclass(slots=True)
+class AttendanceCourse:
+    course_code: str
+    course_name: str
+    section: str
+    attendance_percentage: Optional[str]
+    lectures: list[Lecture] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class AttendanceReport:
+    courses: list[AttendanceCourse] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class AssessmentItem:
+    number: str
+    weightage: Optional[float]
+    obtained_marks: Optional[float]
+    total_marks: Optional[float]
+    average: Optional[float]
+    std_dev: Optional[str]
+    min: Optional[float]
+    max: Optional[float]
+
+
+@dataclass(slots=True)
+class Assessment:
+    items: list[AssessmentItem] = field(default_factory=list)
+    total_weightage: Optional[float] = None
+    total_obtained: Optional[float] = None
+
+
+@dataclass(slots=True)
+class MarksCourse:
+    course_code: str
+    course_name: str
+    section: str
+    assessments: dict[str, Assessment] = field(default_factory=dict)
+    total_obtained: float = 0.0
+    total_weightage: float = 0.0
+
+
+@dataclass(slots=True)
+class MarksReport:
+    courses: list[MarksCourse] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class TranscriptCourse:
+    code: str
+    name: str
+    section: str
+    credit_hours: str
+    grade: str
+    points: str
+    type: str  # "Core" or "Elective"
+    remarks: str
+    offer_id: Optional[str]  # For fetching MCA
+    has_mca: bool  # True if uses relative grading (MCA)
+
+
+@dataclass(slots=True)
+class Semester:
+    name: str
+    credits_attempted: Optional[int] = None
+    credits_earned: Optional[int] = None
+    cgpa: Optional[float] = None
+    sgpa: Optional[float] = None
+    courses: list[TranscriptCourse] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Transcript:
+    semesters: list[Semester] = field(default_factory=list)
+    cgpa: Optional[float] = None
+    student_info: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class RegisteredCourse:
+    code: str
+    name: str
+    section: str
+    credits: str
+    instructor: str
+
+
+@dataclass(slots=True)
+class CourseRegistration:
+    courses: list[RegisteredCourse] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Payment:
+    sr_no: str
+    semester: str
+    challan_no: str
+    instrument_type: str
+    instrument_no: str
+    amount: str
+    due_date: str
+    payment_date: str
+    entered_by: str
+    status: str
+
+
+@dataclass(slots=True)
+class FeeReport:
+    payments: list[Payment] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class ChallanItem:
+    description: str
+    amount: Optional[float]
+
+
+@dataclass(slots=True)
+class Challan:
+    challan_no: str = ""
+    amount: Optional[float] = None
+    due_date: str = ""
+    breakdown: list[ChallanItem] = field(default_factory=list)
+
+
+def project(items: list, names: Optional[list[str]]) -> list:
+    """Only the named fields of each model, or the models unchanged when no names are given."""
+    if not names or not items:
+        return items
+    known = [f.name for f in fields(items[0])]
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise ValueError(f"Unknown fields {', '.join(unknown)}; choose from {', '.join(known)}")
+    return [{name: getattr(item, name) for name in names} for item in items]
+
+
+def page(items: list, limit: Optional[int], offset: int) -> list:
+    offset = max(0, offset)
+    return items[offset:offset + limit] if limit is not None else items[offset:]
+
+
+def from_dict(cls: type, data: dict) -> Any:
+    """Rebuild a model, and the models nested in it, from its asdict() form (e.g. a stored snapshot)."""
+    hints = get_type_hints(cls)
+    return cls(**{f.name: _build(hints[f.name], data[f.name]) for f in fields(cls) if f.name in data})
+
+
+def _build(hint: Any, value: Any) -> Any:
+    if value is None:
+        return None
+    origin = get_origin(hint)
+    if origin is Union:
+        hint = next(arg for arg in get_args(hint) if arg is not type(None))
+        origin = get_origin(hint)
+    if origin is list:
+        return [_build(get_args(hint)[0], item) for item in value]
+    if origin is dict:
+        return {key: _build(get_args(hint)[1], item) for key, item in value.items()}
+    if is_dataclass(hint):
+        return from_dict(hint, value)
+    return value
@@ -0,0 +1,60 @@
+import re
+from typing import Optional
+
+# Course headers look like "CS2001-Data Structures (BCS-3A)"
+COURSE_HEADER = re.compile(r"([A-Z]{2}\d+)-(.+?)\s*\(([^)]+)\)")
+COURSE_HEADER_PREFIX = re.compile(r"[A-Z]{2}\d+-.+")
+COURSE_CODE = re.compile(r"[A-Z]{2}\d+")
+PERCENTAGE = re.compile(r"\d+\.\d+%")
+
+# Transcript
+SEMESTER_NAME = re.compile(r"(Fall|Spring|Summer)\s+\d{4}")
+CREDITS_ATTEMPTED = re.compile(r"Cr\.\s*Att:\s*(\d+)")
+CREDITS_EARNED = re.compile(r"Cr\.\s*Ernd:\s*(\d+)")
+CGPA = re.compile(r"CGPA:\s*(\d+\.?\d*)")
+SGPA = re.compile(r"SGPA:\s*(\d+\.?\d*)")
+GRADE_SCHEME_ONCLICK = re.compile(r"fn_StdGradeSchemeDetail\((\d+)\)")
+
+# Marks
+TOTAL_ROW_CLASS = re.compile(r"totalColumn")
+TAB_PANE_START = re.compile(r"""<div\b[^>]*\bclass\s*=\s*(["'])(?:[^"']*\s)?tab-pane(?:\s[^"']*)?\1[^>]*>""", re.I)
+# Markup tokens for slicing panes without a parser. Comments and raw-text elements are
+# matched whole so tags inside them are skipped; attribute values may hold "<" and ">".
+_ATTRS = r"""(?:[^>"']|"[^"]*"|'[^']*')*"""
+HTML_TOKEN = re.compile(
+    rf"<!--.*?-->|<(script|style|textarea)\b{_ATTRS}>.*?</\1\s*>|<(/?)([a-z][\w:-]*){_ATTRS}>", re.I | re.S
+)
+
+# Challan
+CHALLAN_AMOUNT = re.compile(r"^(?:Rs\.?|PKR)?\s*(\d[\d,]*(?:\.\d+)?)\s*(?:/-)?$", re.I)
+CHALLAN_NO_LABEL = re.compile(r"challan\s*(?:no|number|#)", re.I)
+CHALLAN_DUE_LABEL = re.compile(r"due\s*date", re.I)
+CHALLAN_TOTAL_LABEL = re.compile(r"total|payable|net\s*amount", re.I)
+# Rows that carry details rather than fee heads, even when their value looks like an amount
+CHALLAN_DETAIL_LABEL = re.compile(r"challan|account|roll|cnic|phone|contact", re.I)
+
+# Links carrying a dump token, either in an href or anywhere else in the page (e.g. scripts)
+DUMP_LINK = re.compile(r'(href=")?(/[A-Za-z][^"\'?]*)\?[^"\']*dump=([^"\'&]+)')
+
+
+def parse_course_header(text: str) -> Optional[tuple[str, str, str]]:
+    """Split a course header into (code, name, section), or None if it is not one."""
+    match = COURSE_HEADER.match(text)
+    if not match:
+        return None
+    return match.group(1), match.group(2).strip(), match.group(3)
+
+
+def extract_dump_tokens(page_source: str) -> dict[str, str]:
+    """Map page paths to their dump token in one pass over the page.
+
+    Tokens from href links win over tokens found elsewhere in the page.
+    """
+    tokens: dict[str, str] = {}
+    for match in DUMP_LINK.finditer(page_source):
+        is_href, path, dump_value = match.groups()
+        if is_href:
+            tokens[path] = dump_value
+        else:
+            tokens.setdefault(path, dump_value)
+    return tokens
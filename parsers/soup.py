@@ -0,0 +1,30 @@
+import importlib.util
+import os
+import re
+from typing import Optional
+from bs4 import BeautifulSoup, SoupStrainer
+
+
+def _default_backend() -> str:
+    """lxml when installed (much faster tree building), otherwise the stdlib html.parser."""
+    backend = os.getenv("FLEX_HTML_PARSER")
+    if backend:
+        return backend
+    return "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+
+BACKEND = _default_backend()
+
+
+def has_class(*names: str) -> re.Pattern:
+    """Match elements carrying any of the given CSS classes.
+
+    Strainers see the raw class attribute while parsing (e.g. "tab-pane fade active"),
+    so a plain class_="tab-pane" would miss elements with more than one class.
+    """
+    return re.compile(r"(?:^|\s)(?:%s)(?:\s|$)" % "|".join(map(re.escape, names)))
+
+
+def make_soup(html: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """Build a soup with the shared backend, only keeping elements matched by parse_only."""
+    return BeautifulSoup(html, BACKEND, parse_only=parse_only)
@@ -0,0 +1,298 @@
+"""Incremental parsers that never build a document tree.
+
+Fed chunk by chunk (e.g. from an httpx streamed response), they build
+lectures and assessment items as their table rows close and keep nothing
+else of the page, so peak memory stays near the size of one chunk plus the
+result. They produce the same models as parse_attendance and parse_marks.
+
+    parser = AttendanceStream(course_code="CS2001")
+    for chunk in chunks:
+        parser.feed(chunk)
+    report = parser.close()
+"""
+from html.parser import HTMLParser
+from typing import Any, Callable, Optional
+
+from parsers.models import (
+    Assessment, AssessmentItem, AttendanceCourse, AttendanceReport, Lecture, MarksCourse, MarksReport
+)
+from parsers.patterns import COURSE_HEADER_PREFIX, PERCENTAGE, TOTAL_ROW_CLASS, parse_course_header
+
+
+class _TextCapture(HTMLParser):
+    """Collects the text of elements as get_text(strip=True) would: each text node stripped, then joined.
+    
+    A text node can arrive in several handle_data calls when it spans chunks,
+    so it is only stripped once the next tag starts. Subclasses implement
+    start and end instead of handle_starttag and handle_endtag.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._captures: list[list[str]] = []
+        self._text: list[str] = []
+
+    def _flush(self) -> None:
+        if self._text:
+            piece = "".join(self._text).strip()
+            self._text.clear()
+            if piece:
+                for capture in self._captures:
+                    capture.append(piece)
+
+    def _start_capture(self) -> None:
+        self._captures.append([])
+
+    def _end_capture(self) -> str:
+        return "".join(self._captures.pop()) if self._captures else ""
+
+    def handle_data(self, data: str) -> None:
+        if self._captures:
+            self._text.append(data)
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        self._flush()
+        self.start(tag, attrs)
+
+    def handle_endtag(self, tag: str) -> None:
+        self._flush()
+        self.end(tag)
+
+    def handle_comment(self, data: str) -> None:
+        self._flush()
+
+    def start(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        raise NotImplementedError
+
+    def end(self, tag: str) -> None:
+        raise NotImplementedError
+
+    @staticmethod
+    def _classes(attrs: list[tuple[str, Optional[str]]]) -> list[str]:
+        return next((value or "" for name, value in attrs if name == "class"), "").split()
+
+
+class AttendanceStream(_TextCapture):
+    """Streaming parse_attendance, with the same course_code and lectures filters."""
+
+    def __init__(self, course_code: Optional[str] = None, lectures: bool = True):
+        super().__init__()
+        self.course_code = course_code
+        self.lectures = lectures
+        self._headers: list[str] = []
+        self._percentages: list[str] = []
+        # Lectures of each attendance table seen so far, empty for courses filtered out
+        self._tables: list[Optional[list[Lecture]]] = []
+        self._table_depth = 0
+        self._table_headers: list[str] = []
+        self._rows: list[Lecture] = []
+        self._row: Optional[list[str]] = None
+
+    def _keep_rows(self) -> bool:
+        """Whether rows of the table being read are wanted, judged by its course header."""
+        if not self.lectures:
+            return False
+        index = len(self._tables)
+        if not self.course_code or index >= len(self._headers):
+            return True  # Header not seen yet, decide when the course is built
+        code = (parse_course_header(self._headers[index]) or ("",))[0]
+        return code.lower() == self.course_code.lower()
+
+    def start(self, tag: str, attrs) -> None:
+        if tag == "h5" or (self._table_depth and tag in ("th", "td")):
+            self._start_capture()
+        elif tag == "table":
+            self._table_depth += 1
+            if self._table_depth == 1:
+                self._table_headers, self._rows, self._row = [], [], None
+        elif tag == "tr" and self._table_depth:
+            self._row = []
+
+    def end(self, tag: str) -> None:
+        if tag == "h5":
+            text = self._end_capture()
+            if COURSE_HEADER_PREFIX.match(text):
+                self._headers.append(text)
+            elif PERCENTAGE.match(text):
+                self._percentages.append(text)
+        elif tag == "th" and self._table_depth:
+            self._table_headers.append(self._end_capture())
+        elif tag == "td" and self._table_depth:
+            text = self._end_capture()
+            if self._row is not None:
+                self._row.append(text)
+        elif tag == "tr" and self._row is not None:
+            if len(self._row) >= 4 and self._keep_rows():
+                self._rows.append(Lecture(*self._row[:4]))
+            self._row = None
+        elif tag == "table" and self._table_depth:
+            self._table_depth -= 1
+            if not self._table_depth and ("Lecture No" in self._table_headers or "Date" in self._table_headers):
+                self._tables.append(self._rows)
+            self._rows = []
+
+    def close(self) -> AttendanceReport:
+        super().close()
+        result = AttendanceReport()
+        for i, rows in enumerate(self._tables):
+            course_name = self._headers[i] if i < len(self._headers) else f"Course {i+1}"
+            percentage = self._percentages[i] if i < len(self._percentages) else None
+            code, name, section = parse_course_header(course_name) or ("", course_name, "")
+            if self.course_code and code.lower() != self.course_code.lower():
+                continue
+            result.courses.append(AttendanceCourse(code, name, section, percentage, rows if self.lectures else []))
+        return result
+
+
+def _parse_float(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value and value != "-" else None
+    except ValueError:
+        return None
+
+
+class MarksStream(_TextCapture):
+    """Streaming parse_marks: one course per tab-pane, one assessment per card."""
+
+    def __init__(self):
+        super().__init__()
+        self.result = MarksReport()
+        # What each open div is: "pane", "card" or None
+        self._divs: list[Optional[str]] = []
+        self._course: Optional[MarksCourse] = None
+        self._header_done = False
+        self._in_header = False
+        # Current card: its button text, table state and the assessment being built
+        self._card = False
+        self._button: Optional[str] = None
+        self._in_button = False
+        self._table_depth = 0
+        self._table_seen = False
+        self._assessment: Optional[Assessment] = None
+        self._in_tfoot = False
+        self._total_found = False
+        self._row: Optional[list[str]] = None
+        self._row_kind: Optional[str] = None  # "item" or "total"
+        self._cell_class: Optional[str] = None
+        self._totals: dict[str, str] = {}
+
+    def start(self, tag: str, attrs) -> None:
+        classes = self._classes(attrs)
+        if tag == "div":
+            kind = "pane" if "tab-pane" in classes else "card" if "card" in classes and self._course else None
+            self._divs.append(kind)
+            if kind == "pane":
+                self._course, self._header_done = MarksCourse("", "", ""), False
+            elif kind == "card":
+                self._card, self._button, self._table_seen, self._assessment = True, None, False, None
+            return
+        if self._course is None:
+            return
+        if tag == "h5" and not self._header_done:
+            self._in_header = True
+            self._start_capture()
+        elif not self._card:
+            return
+        elif tag == "button" and self._button is None and not self._in_button:
+            self._in_button = True
+            self._start_capture()
+        elif tag == "table":
+            self._table_depth += 1
+            if self._table_depth == 1 and not self._table_seen:
+                self._table_seen = True
+                self._assessment, self._total_found, self._totals = Assessment(), False, {}
+        elif self._assessment is None or self._table_depth != 1:
+            return
+        elif tag == "tfoot":
+            self._in_tfoot = True
+        elif tag == "tr":
+            if "calculationrow" in classes:
+                self._row_kind = "item"
+            elif not self._total_found and (any(TOTAL_ROW_CLASS.search(c) for c in classes) or self._in_tfoot):
+                self._row_kind = "total"
+                self._total_found = True
+            else:
+                self._row_kind = None
+            self._row = []
+        elif tag == "td" and self._row is not None:
+            self._cell_class = next((c for c in classes if c in ("totalColweightage", "totalColObtMarks")), None)
+            self._start_capture()
+
+    def end(self, tag: str) -> None:
+        if tag == "div":
+            kind = self._divs.pop() if self._divs else None
+            if kind == "card":
+                self._end_card()
+            elif kind == "pane":
+                self._end_pane()
+            return
+        if self._course is None:
+            return
+        if tag == "h5" and self._in_header:
+            self._in_header, self._header_done = False, True
+            header = parse_course_header(self._end_capture())
+            if header:
+                self._course.course_code, self._course.course_name, self._course.section = header
+            else:
+                self._course = None  # Not a course pane, skip everything up to its end
+        elif tag == "button" and self._in_button:
+            self._in_button = False
+            self._button = self._end_capture()
+        elif tag == "table" and self._table_depth:
+            self._table_depth -= 1
+        elif tag == "tfoot":
+            self._in_tfoot = False
+        elif tag == "td" and self._row is not None:
+            text = self._end_capture()
+            self._row.append(text)
+            if self._row_kind == "total" and self._cell_class and self._cell_class not in self._totals:
+                self._totals[self._cell_class] = text
+        elif tag == "tr" and self._row is not None:
+            self._end_row(self._row)
+            self._row = None
+
+    def _end_row(self, cols: list[str]) -> None:
+        if self._row_kind == "item" and len(cols) >= 4:
+            self._assessment.items.append(AssessmentItem(
+                number=cols[0],
+                weightage=_parse_float(cols[1]),
+                obtained_marks=_parse_float(cols[2]),
+                total_marks=_parse_float(cols[3]),
+                average=_parse_float(cols[4]) if len(cols) > 4 else None,
+                std_dev=cols[5] if len(cols) > 5 and cols[5] else None,
+                min=_parse_float(cols[6]) if len(cols) > 6 else None,
+                max=_parse_float(cols[7]) if len(cols) > 7 else None
+            ))
+
+    def _end_card(self) -> None:
+        assessment, button = self._assessment, self._button
+        self._card, self._assessment, self._table_depth = False, None, 0
+        if self._course is None or assessment is None or not button or "Grand Total" in button:
+            return
+        if "totalColweightage" in self._totals:
+            assessment.total_weightage = _parse_float(self._totals["totalColweightage"])
+        if "totalColObtMarks" in self._totals:
+            assessment.total_obtained = _parse_float(self._totals["totalColObtMarks"])
+        if assessment.total_weightage:
+            self._course.total_weightage += assessment.total_weightage
+        if assessment.total_obtained:
+            self._course.total_obtained += assessment.total_obtained
+        if assessment.items:
+            self._course.assessments[button] = assessment
+
+    def _end_pane(self) -> None:
+        if self._course is not None and self._course.course_code and self._course.assessments:
+            self.result.courses.append(self._course)
+        self._course = None
+
+    def close(self) -> MarksReport:
+        super().close()
+        return self.result
+
+
+def streaming_parser(parser: Callable[..., Any]) -> Optional[Callable[..., _TextCapture]]:
+    """The incremental equivalent of a parser function, if there is one."""
+    from parsers.attendance import parse_attendance
+    from parsers.marks import parse_marks
+
+    return {parse_attendance: AttendanceStream, parse_marks: MarksStream}.get(parser)
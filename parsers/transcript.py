@@ -1,19 +1,34 @@
-from typing import Any
-from bs4 import BeautifulSoup
-import re
+from dataclasses import replace
+from typing import Optional
+from bs4 import SoupStrainer
+from parsers import patterns
+from parsers.models import Semester, Transcript, TranscriptCourse
+from parsers.soup import has_class, make_soup
 
+# Student info header and the per-semester sections
+_STRAINER = SoupStrainer("div", class_=has_class("m-portlet__body", "col-md-6"))
 
-def parse_transcript(html: str) -> dict[str, Any]:
+
+def _wanted(value: str, wanted: Optional[str]) -> bool:
+    return not wanted or value.lower() == wanted.lower()
+
+
+def parse_transcript(html: str, semester: Optional[str] = None, course_code: Optional[str] = None,
+                     courses: bool = True) -> Transcript:
     """Parse transcript page HTML.
     
     Structure: Each semester is in a col-md-6 div with:
     - h5 with semester name (e.g., "Fall 2022")
     - pull-right div with spans: Cr. Att, Cr. Ernd, CGPA, SGPA
     - table with courses
+    
+    semester (a name like "Fall 2022") and course_code keep only matching
+    semesters and courses, and courses=False keeps just the semester stats.
+    Rows that are filtered out are never built; cgpa is still the overall one.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    soup = make_soup(html, _STRAINER)
     
-    result = {"semesters": [], "cgpa": None, "student_info": {}}
+    result = Transcript()
     
     # Extract student info from header
     student_info_div = soup.find("div", class_="m-portlet__body")
@@ -21,16 +36,17 @@ def parse_transcript(html: str) -> dict[str, Any]:
         for span in student_info_div.find_all("span"):
             text = span.get_text(strip=True)
             if text.startswith("ARN:"):
-                result["student_info"]["arn"] = text.replace("ARN:", "").strip()
+                result.student_info["arn"] = text.replace("ARN:", "").strip()
             elif text.startswith("Roll No:"):
-                result["student_info"]["roll_no"] = text.replace("Roll No:", "").strip()
+                result.student_info["roll_no"] = text.replace("Roll No:", "").strip()
             elif text.startswith("Name:"):
-                result["student_info"]["name"] = text.replace("Name:", "").strip()
+                result.student_info["name"] = text.replace("Name:", "").strip()
             elif text.startswith("Batch:"):
-                result["student_info"]["batch"] = text.replace("Batch:", "").strip()
+                result.student_info["batch"] = text.replace("Batch:", "").strip()
     
     # Find all semester sections (col-md-6 divs containing tables)
     semester_sections = soup.find_all("div", class_="col-md-6")
+    overall_cgpa = None
     
     for section in semester_sections:
         # Find semester name from h5
@@ -39,81 +55,104 @@ def parse_transcript(html: str) -> dict[str, Any]:
             continue
         
         semester_name = h5.get_text(strip=True)
-        if not re.match(r"(Fall|Spring|Summer)\s+\d{4}", semester_name):
+        if not patterns.SEMESTER_NAME.match(semester_name):
             continue
         
-        semester_data = {
-            "name": semester_name,
-            "credits_attempted": None,
-            "credits_earned": None,
-            "cgpa": None,
-            "sgpa": None,
-            "courses": []
-        }
+        semester_data = Semester(semester_name)
         
         # Extract stats from pull-right div
         pull_right = section.find("div", class_="pull-right")
         if pull_right:
             stats_text = pull_right.get_text()
             
-            cr_att = re.search(r"Cr\.\s*Att:\s*(\d+)", stats_text)
+            cr_att = patterns.CREDITS_ATTEMPTED.search(stats_text)
             if cr_att:
-                semester_data["credits_attempted"] = int(cr_att.group(1))
+                semester_data.credits_attempted = int(cr_att.group(1))
             
-            cr_ernd = re.search(r"Cr\.\s*Ernd:\s*(\d+)", stats_text)
+            cr_ernd = patterns.CREDITS_EARNED.search(stats_text)
             if cr_ernd:
-                semester_data["credits_earned"] = int(cr_ernd.group(1))
+                semester_data.credits_earned = int(cr_ernd.group(1))
             
-            cgpa = re.search(r"CGPA:\s*(\d+\.?\d*)", stats_text)
+            cgpa = patterns.CGPA.search(stats_text)
             if cgpa:
-                semester_data["cgpa"] = float(cgpa.group(1))
+                semester_data.cgpa = float(cgpa.group(1))
             
-            sgpa = re.search(r"SGPA:\s*(\d+\.?\d*)", stats_text)
+            sgpa = patterns.SGPA.search(stats_text)
             if sgpa:
-                semester_data["sgpa"] = float(sgpa.group(1))
+                semester_data.sgpa = float(sgpa.group(1))
         
         # Parse courses table
         table = section.find("table")
-        if table:
-            for row in table.find_all("tr"):
-                tds = row.find_all("td")
-                if len(tds) < 5:
-                    continue
-                
-                cols = [td.get_text(strip=True) for td in tds]
-                
-                offer_id = None
-                has_mca = False
-                
-                first_td = tds[0]
-                link = first_td.find("a", onclick=True)
-                if link:
-                    onclick = link.get("onclick", "")
-                    match = re.search(r"fn_StdGradeSchemeDetail\((\d+)\)", onclick)
-                    if match:
-                        offer_id = match.group(1)
-                        has_mca = True
-                
-                course_type = cols[6] if len(cols) > 6 else ""
-                
-                semester_data["courses"].append({
-                    "code": cols[0],
-                    "name": cols[1],
-                    "section": cols[2] if len(cols) > 2 else "",
-                    "credit_hours": cols[3] if len(cols) > 3 else "",
-                    "grade": cols[4] if len(cols) > 4 else "",
-                    "points": cols[5] if len(cols) > 5 else "",
-                    "type": course_type,  # "Core" or "Elective"
-                    "remarks": cols[7] if len(cols) > 7 else "",
-                    "offer_id": offer_id,  # For fetching MCA
-                    "has_mca": has_mca  # True if uses relative grading (MCA)
-                })
+        if not table:
+            continue
         
-        if semester_data["courses"]:
-            result["semesters"].append(semester_data)
+        if not _wanted(semester_name, semester) or not courses:
+            # Only the stats are needed, and whether it has (matching) courses
+            rows = [tds for tds in (row.find_all("td") for row in table.find_all("tr")) if len(tds) >= 5]
+            if rows:
+                overall_cgpa = semester_data.cgpa
+                if _wanted(semester_name, semester) and (
+                    not course_code or any(_wanted(tds[0].get_text(strip=True), course_code) for tds in rows)
+                ):
+                    result.semesters.append(semester_data)
+            continue
+        
+        has_rows = False
+        for row in table.find_all("tr"):
+            tds = row.find_all("td")
+            if len(tds) < 5:
+                continue
+            has_rows = True
+            if course_code and not _wanted(tds[0].get_text(strip=True), course_code):
+                continue
+            
+            cols = [td.get_text(strip=True) for td in tds]
+            
+            offer_id = None
+            has_mca = False
+            
+            first_td = tds[0]
+            link = first_td.find("a", onclick=True)
+            if link:
+                onclick = link.get("onclick", "")
+                match = patterns.GRADE_SCHEME_ONCLICK.search(onclick)
+                if match:
+                    offer_id = match.group(1)
+                    has_mca = True
+            
+            semester_data.courses.append(TranscriptCourse(
+                code=cols[0],
+                name=cols[1],
+                section=cols[2] if len(cols) > 2 else "",
+                credit_hours=cols[3] if len(cols) > 3 else "",
+                grade=cols[4] if len(cols) > 4 else "",
+                points=cols[5] if len(cols) > 5 else "",
+                type=cols[6] if len(cols) > 6 else "",
+                remarks=cols[7] if len(cols) > 7 else "",
+                offer_id=offer_id,
+                has_mca=has_mca
+            ))
+        
+        if has_rows:
+            overall_cgpa = semester_data.cgpa
+        if semester_data.courses:
+            result.semesters.append(semester_data)
     
-    # Get final CGPA from the last semester
-    if result["semesters"]:
-        result["cgpa"] = result["semesters"][-1].get("cgpa")
+    # Final CGPA from the last semester, whether or not it was filtered out
+    result.cgpa = overall_cgpa
     
     return result
+
+
+def filter_transcript(transcript: Transcript, semester: Optional[str] = None, course_code: Optional[str] = None,
+                      courses: bool = True) -> Transcript:
+    """The same filters as parse_transcript, applied to an already parsed transcript."""
+    result = Transcript(cgpa=transcript.cgpa, student_info=transcript.student_info)
+    for term in transcript.semesters:
+        if not _wanted(term.name, semester):
+            continue
+        kept = [course for course in term.courses if _wanted(course.code, course_code)]
+        if course_code and not kept:
+            continue
+        result.semesters.append(replace(term, courses=kept if courses else []))
+    return result
@@ -0,0 +1,128 @@
+"""Background cache warming after login.
+
+Opt in with FLEX_PREFETCH=1. Once a session logs in, the portal pages it
+lists in page_dumps are fetched and parsed in priority order so the first
+questions hit a warm cache (and the snapshot store), then refreshed every
+FLEX_PREFETCH_INTERVAL seconds. Prefetching only fetches while no tool call
+has a request in flight on that session, and shares a small concurrency
+budget across all accounts.
+"""
+import asyncio
+import importlib
+import os
+import time
+from typing import Optional
+
+from auth import FlexSession, _log, background
+from semesters import current_semester_id
+from snapshots import save_snapshot
+
+ENABLED = os.getenv("FLEX_PREFETCH", "").lower() in ("1", "true", "yes")
+# Head start for the tool call whose login started the prefetch
+STARTUP_DELAY = 1.0
+
+# Most useful first: (endpoint, parser, whether it takes the current semid)
+PRIORITY = [
+    ("/Student/StudentAttendance", "parsers.attendance.parse_attendance", False),
+    ("/Student/StudentMarks", "parsers.marks.parse_marks", True),
+    ("/Student/Transcript", "parsers.transcript.parse_transcript", False),
+    ("/Student/CourseRegistration", "parsers.courses.parse_courses", False),
+    ("/ConsolidatedFeeReport/ConsolidatedStdFeeReport", "parsers.fees.parse_fee_report", False),
+]
+
+
+def _parser(dotted: str):
+    module, _, name = dotted.rpartition(".")
+    return getattr(importlib.import_module(module), name)
+
+
+class Prefetcher:
+    def __init__(self, interval: float = 300, concurrency: int = 1):
+        self.interval = interval
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._sessions: dict[str, FlexSession] = {}
+        self.fetched = 0
+        self.failed = 0
+        self.last_run: Optional[float] = None
+
+    @classmethod
+    def from_env(cls) -> "Prefetcher":
+        return cls(
+            interval=float(os.getenv("FLEX_PREFETCH_INTERVAL", "300")),
+            concurrency=int(os.getenv("FLEX_PREFETCH_CONCURRENCY", "1")),
+        )
+
+    @staticmethod
+    def pages(session: FlexSession) -> list[tuple[str, str]]:
+        """(path, parser) to warm for the session's current semester, in priority order."""
+        semid = current_semester_id()
+        return [
+            (f"{endpoint}?semid={semid}" if per_semester else endpoint, parser)
+            for endpoint, parser, per_semester in PRIORITY
+            if not session.page_dumps or endpoint in session.page_dumps
+        ]
+
+    @staticmethod
+    def _active(session: FlexSession) -> bool:
+        return session.is_logged_in() and session.client is not None and not session.client.is_closed
+
+    def schedule(self, session: FlexSession) -> None:
+        task = self._tasks.get(session.roll_no)
+        if task is not None and not task.done():
+            if self._sessions.get(session.roll_no) is session:
+                return
+            # Left over from an evicted session of the same account, still asleep
+            task.cancel()
+        self._sessions[session.roll_no] = session
+        self._tasks[session.roll_no] = asyncio.get_running_loop().create_task(self._run(session))
+
+    async def _run(self, session: FlexSession) -> None:
+        background.set(True)  # Only affects this task
+        await asyncio.sleep(STARTUP_DELAY)
+        while self._active(session):
+            await self.warm(session)
+            self.last_run = time.time()
+            if self.interval <= 0:
+                return
+            await asyncio.sleep(self.interval)
+
+    async def warm(self, session: FlexSession) -> None:
+        for path, parser in self.pages(session):
+            if not self._active(session):
+                return
+            await session.wait_foreground_idle()
+            async with self.semaphore:
+                # A tool call may have started while waiting for the budget
+                await session.wait_foreground_idle()
+                try:
+                    result = await session.get_parsed(path, _parser(parser))
+                    await save_snapshot(session.roll_no, path, result)
+                    self.fetched += 1
+                except Exception as e:
+                    self.failed += 1
+                    _log(f"Prefetch of {path} failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "enabled": ENABLED,
+            "running": sorted(roll for roll, task in self._tasks.items() if not task.done()),
+            "fetched": self.fetched,
+            "failed": self.failed,
+            "last_run": self.last_run,
+        }
+
+
+_prefetcher: Optional[Prefetcher] = None
+
+def get_prefetcher() -> Prefetcher:
+    global _prefetcher
+    if _prefetcher is None:
+        _prefetcher = Prefetcher.from_env()
+    return _prefetcher
+
+
+def schedule(session: FlexSession) -> None:
+    """Start warming a freshly logged-in session's pages if FLEX_PREFETCH is on."""
+    if ENABLED:
+        get_prefetcher().schedule(session)
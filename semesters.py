@@ -0,0 +1,82 @@
+import os
+from datetime import date
+from typing import Optional
+
+# Semester ID suffixes: YYYY + (1=spring, 2=summer, 3=fall)
+SPRING, SUMMER, FALL = "1", "2", "3"
+TERMS = {SPRING: "Spring", SUMMER: "Summer", FALL: "Fall"}
+
+
+def current_semester_id(today: Optional[date] = None) -> str:
+    """Semester ID in progress today, e.g. '20253' in October 2025.
+
+    Spring runs January to May, summer June and July, fall August to December.
+    FLEX_CURRENT_SEMESTER overrides the guess around semester boundaries.
+    """
+    override = os.getenv("FLEX_CURRENT_SEMESTER")
+    if override:
+        return override
+    today = today or date.today()
+    term = SPRING if today.month <= 5 else SUMMER if today.month <= 7 else FALL
+    return f"{today.year}{term}"
+
+
+def semester_name(semester_id: str) -> str:
+    """Transcript name of a semester ID, e.g. 'Fall 2025' for '20253'."""
+    if len(semester_id) != 5 or not semester_id.isdigit() or semester_id[4] not in TERMS:
+        raise ValueError(f"Invalid semester ID {semester_id!r}, expected YYYY + (1=spring, 2=summer, 3=fall)")
+    return f"{TERMS[semester_id[4]]} {semester_id[:4]}"
+
+
+def _next(semester_id: str, include_summer: bool) -> str:
+    year, term = int(semester_id[:4]), semester_id[4]
+    if term == SPRING:
+        return f"{year}{SUMMER if include_summer else FALL}"
+    if term == SUMMER:
+        return f"{year}{FALL}"
+    return f"{year + 1}{SPRING}"
+
+
+def semester_range(start: str, end: str, include_summer: bool = False) -> list[str]:
+    """Semester IDs from start to end inclusive, e.g. '20241'..'20251' -> ['20241', '20243', '20251']."""
+    semester_name(start), semester_name(end)  # Validate both
+    if start > end:
+        raise ValueError(f"Semester range starts after it ends: {start} > {end}")
+    ids, current = [], start
+    while current <= end:
+        if include_summer or current[4] != SUMMER or current == start:
+            ids.append(current)
+        current = _next(current, include_summer)
+    return ids
+
+
+def last_semesters(count: int, include_summer: bool = False, until: Optional[str] = None) -> list[str]:
+    """The count most recent semester IDs up to until (the current semester by default), oldest first."""
+    if count < 1:
+        raise ValueError(f"Need at least one semester, got {count}")
+    end = until or current_semester_id()
+    year = int(end[:4]) - count  # Far enough back for any count
+    return semester_range(f"{year}{SPRING}", end, include_summer)[-count:]
+
+
+# Upper bound on semesters per range query, each one is a portal fetch
+MAX_RANGE = 12
+
+
+def resolve_semesters(semester_ids: Optional[list[str]] = None, start: Optional[str] = None,
+                      end: Optional[str] = None, last: Optional[int] = None,
+                      include_summer: bool = False) -> list[str]:
+    """Semester IDs for a range query, from an explicit list, start/end or the last few."""
+    if semester_ids:
+        for semester_id in semester_ids:
+            semester_name(semester_id)
+        ids = list(dict.fromkeys(semester_ids))
+    elif start or end:
+        ids = semester_range(start or end, end or current_semester_id(), include_summer)
+    elif last:
+        ids = last_semesters(last, include_summer)
+    else:
+        raise ValueError("Give semester_ids, start (and optionally end) or last")
+    if len(ids) > MAX_RANGE:
+        raise ValueError(f"{len(ids)} semesters requested, at most {MAX_RANGE} per call")
+    return ids
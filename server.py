@@ -9,6 +9,10 @@ import tools.mca
 import tools.courses
 import tools.fees
 import tools.status
+import tools.snapshot
+import tools.history
+import tools.analytics
+import tools.server_metrics
 
 
 if __name__ == "__main__":
@@ -0,0 +1,75 @@
+import base64
+import hashlib
+import json
+import os
+import secrets
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+_KDF_ITERATIONS = 100_000
+
+
+def _log(msg: str):
+    print(msg, file=sys.stderr)
+
+
+def _derive_key(secret: str, salt: bytes) -> bytes:
+    """Derive a Fernet key from the account password (or FLEX_SESSION_KEY)."""
+    raw = hashlib.pbkdf2_hmac("sha256", secret.encode(), salt, _KDF_ITERATIONS)
+    return base64.urlsafe_b64encode(raw)
+
+
+def _secret_for(password: str) -> str:
+    return os.getenv("FLEX_SESSION_KEY") or password
+
+
+def save_session(path: Path, roll_no: str, password: str, cookies: dict, page_dumps: dict) -> None:
+    """Encrypt and write cookies and dump tokens for roll_no to path."""
+    salt = secrets.token_bytes(16)
+    payload = json.dumps({
+        "roll_no": roll_no,
+        "saved_at": time.time(),
+        "cookies": cookies,
+        "page_dumps": page_dumps,
+    }).encode()
+    from cryptography.fernet import Fernet
+
+    token = Fernet(_derive_key(_secret_for(password), salt)).encrypt(payload)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"salt": base64.b64encode(salt).decode(), "token": token.decode()}, f)
+    os.chmod(tmp_path, 0o600)
+    os.replace(tmp_path, path)
+
+
+def load_session(path: Path, roll_no: str, password: str) -> Optional[dict[str, Any]]:
+    """Return the stored session for roll_no, or None if missing, unreadable or for another account."""
+    if not path.exists():
+        return None
+
+    from cryptography.fernet import Fernet, InvalidToken
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            envelope = json.load(f)
+        salt = base64.b64decode(envelope["salt"])
+        key = _derive_key(_secret_for(password), salt)
+        data = json.loads(Fernet(key).decrypt(envelope["token"].encode()))
+    except (OSError, ValueError, KeyError, InvalidToken) as e:
+        _log(f"Ignoring unreadable session file {path}: {type(e).__name__}")
+        return None
+
+    if data.get("roll_no") != roll_no:
+        return None
+    return data
+
+
+def clear_session(path: Path) -> None:
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
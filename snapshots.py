@@ -0,0 +1,306 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from auth import DATA_DIR, _log, ensure_logged_in, get_session
+from cache import ResponseCache
+from parsers.models import from_dict
+from semesters import semester_name
+
+SNAPSHOT_DB = Path(os.getenv("FLEX_SNAPSHOT_DB", DATA_DIR / "snapshots.db")).expanduser()
+ENABLED = os.getenv("FLEX_SNAPSHOTS", "1").lower() not in ("0", "false", "no")
+
+# Friendly names for the pages whose parses are stored
+KINDS = {
+    "/Student/StudentAttendance": "attendance",
+    "/Student/StudentMarks": "marks",
+    "/Student/Transcript": "transcript",
+    "/Student/CourseRegistration": "courses",
+    "/ConsolidatedFeeReport/ConsolidatedStdFeeReport": "fees",
+}
+
+# live: fetch from the portal, falling back to the latest snapshot if that fails
+# prefer_cache: latest snapshot if there is one, otherwise fetch
+# offline: latest snapshot only, never touch the network
+SOURCES = ("live", "prefer_cache", "offline")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    roll_no TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    semester TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    last_seen_at TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    model TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_lookup ON snapshots (roll_no, kind, semester, fetched_at);
+
+CREATE TABLE IF NOT EXISTS course_snapshots (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id) ON DELETE CASCADE,
+    roll_no TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    semester TEXT NOT NULL,
+    course_code TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS course_snapshots_semester ON course_snapshots (roll_no, kind, semester, course_code);
+CREATE INDEX IF NOT EXISTS course_snapshots_course ON course_snapshots (roll_no, course_code, fetched_at);
+"""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _course_rows(kind: str, semester: str, data: dict) -> list[tuple[str, str, dict]]:
+    """(semester, course_code, course) for each course in a parsed page."""
+    if kind == "transcript":
+        # The transcript spans every semester, index its courses under the semester name
+        return [
+            (term["name"], course["code"], course)
+            for term in data["semesters"]
+            for course in term["courses"]
+        ]
+    return [
+        (semester, course.get("course_code") or course.get("code") or "", course)
+        for course in data.get("courses", [])
+    ]
+
+
+class SnapshotStore:
+    """Every successful parse per roll number, page and semester, in SQLite.
+
+    A parse identical to the latest stored one only bumps its last_seen_at, so
+    a new row means the page actually changed. Courses are also stored one row
+    each, indexed on semester and course code, for historical queries.
+    """
+
+    def __init__(self, path: Path = SNAPSHOT_DB):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def save(self, roll_no: str, path: str, result: Any) -> None:
+        """Store a parsed page. Pages without a KINDS entry are ignored."""
+        endpoint, semester, _ = ResponseCache.key(path, roll_no)
+        kind = KINDS.get(endpoint)
+        if kind is None:
+            return
+        data = asdict(result)
+        payload = json.dumps(data, separators=(",", ":"))
+        digest = hashlib.sha256(payload.encode()).hexdigest()
+        now = _now()
+
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                latest = conn.execute(
+                    "SELECT id, digest FROM snapshots WHERE roll_no = ? AND kind = ? AND semester = ?"
+                    " ORDER BY fetched_at DESC LIMIT 1",
+                    (roll_no, kind, semester),
+                ).fetchone()
+                if latest and latest["digest"] == digest:
+                    conn.execute("UPDATE snapshots SET last_seen_at = ? WHERE id = ?", (now, latest["id"]))
+                    return
+                snapshot_id = conn.execute(
+                    "INSERT INTO snapshots (roll_no, kind, semester, fetched_at, last_seen_at, digest, model, payload)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (roll_no, kind, semester, now, now, digest, type(result).__name__, payload),
+                ).lastrowid
+                conn.executemany(
+                    "INSERT INTO course_snapshots (snapshot_id, roll_no, kind, semester, course_code, fetched_at, payload)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (snapshot_id, roll_no, kind, term, code, now, json.dumps(course, separators=(",", ":")))
+                        for term, code, course in _course_rows(kind, semester, data)
+                    ],
+                )
+
+    def latest(self, roll_no: str, path: str, model: type) -> Optional[tuple[Any, dict]]:
+        """The most recent stored parse of a page as (model instance, {fetched_at, last_seen_at})."""
+        endpoint, semester, _ = ResponseCache.key(path, roll_no)
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT fetched_at, last_seen_at, payload FROM snapshots WHERE roll_no = ? AND kind = ? AND semester = ?"
+                " ORDER BY fetched_at DESC LIMIT 1",
+                (roll_no, KINDS.get(endpoint, endpoint), semester),
+            ).fetchone()
+        if row is None:
+            return None
+        return from_dict(model, json.loads(row["payload"])), {
+            "fetched_at": row["fetched_at"],
+            "last_seen_at": row["last_seen_at"],
+        }
+
+    def inventory(self, roll_no: str) -> list[dict]:
+        """What is stored: one entry per page and semester."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT kind, semester, COUNT(*) AS versions, MIN(fetched_at) AS first_fetched_at,"
+                " MAX(last_seen_at) AS last_seen_at FROM snapshots WHERE roll_no = ?"
+                " GROUP BY kind, semester ORDER BY kind, semester",
+                (roll_no,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def course_history(self, roll_no: str, kind: str, course_code: Optional[str] = None,
+                       semester: Optional[str] = None) -> list[dict]:
+        """Every stored version of each course, oldest first."""
+        query = "SELECT semester, course_code, fetched_at, payload FROM course_snapshots WHERE roll_no = ? AND kind = ?"
+        params: list[Any] = [roll_no, kind]
+        if course_code:
+            query += " AND course_code = ? COLLATE NOCASE"
+            params.append(course_code)
+        if semester is not None:
+            query += " AND semester = ?"
+            params.append(semester)
+        with self._lock:
+            rows = self._connect().execute(query + " ORDER BY fetched_at", params).fetchall()
+        return [
+            {"semester": row["semester"], "course_code": row["course_code"],
+             "fetched_at": row["fetched_at"], **json.loads(row["payload"])}
+            for row in rows
+        ]
+
+
+_store: Optional[SnapshotStore] = None
+
+def get_snapshot_store() -> SnapshotStore:
+    """The shared store. Raises RuntimeError with FLEX_SNAPSHOTS=0, so nothing reads or creates it."""
+    global _store
+    if not ENABLED:
+        raise RuntimeError("Snapshots are disabled (FLEX_SNAPSHOTS=0)")
+    if _store is None:
+        _store = SnapshotStore()
+    return _store
+
+
+async def load_parsed(path: str, parser: Callable[..., Any], model: type,
+                      source: str = "live", account: Optional[str] = None,
+                      filters: Optional[dict] = None,
+                      refine: Optional[Callable[..., Any]] = None) -> tuple[Any, Optional[dict]]:
+    """Parsed page from the portal or the snapshot store, depending on source.
+
+    Returns (result, snapshot) where snapshot is None for a live result and
+    otherwise says when the stored copy was fetched and last confirmed.
+    Filters are passed to the parser for live pages and to refine for stored
+    ones. Unfiltered live results are written to the store. With FLEX_SNAPSHOTS=0
+    the store is never touched: every source fetches live and offline fails.
+    """
+    filters = filters or {}
+    if source not in SOURCES:
+        raise ValueError(f"Unknown source {source!r}, use one of {', '.join(SOURCES)}")
+    if not ENABLED:
+        # No store to answer from or fall back on, so every source is a live fetch
+        if source == "offline":
+            raise LookupError("Snapshots are disabled (FLEX_SNAPSHOTS=0), use source='live'")
+        session = await ensure_logged_in(account)
+        return await session.get_parsed(path, parser, **filters), None
+    store = get_snapshot_store()
+    roll_no = get_session(account).roll_no
+
+    async def stored() -> Optional[tuple[Any, dict]]:
+        cached = await asyncio.to_thread(store.latest, roll_no, path, model)
+        if cached and filters and refine:
+            return refine(cached[0], **filters), cached[1]
+        return cached
+
+    if source != "live":
+        cached = await stored()
+        if cached:
+            return cached
+        if source == "offline":
+            raise LookupError(f"No stored snapshot of {path} yet, fetch it once with source='live'")
+
+    try:
+        session = await ensure_logged_in(account)
+        result = await session.get_parsed(path, parser, **filters)
+    except Exception as e:
+        cached = await stored() if source == "live" else None
+        if not cached:
+            raise
+        _log(f"Serving stored snapshot of {path}: {e}")
+        return cached[0], {**cached[1], "reason": str(e)}
+
+    if not filters:
+        # A filtered parse is not the whole page, the store only keeps whole pages
+        await save_snapshot(roll_no, path, result)
+    return result, None
+
+
+async def load_semesters(endpoint: str, semester_ids: list[str], parser: Callable[..., Any], model: type,
+                         source: str = "live", account: Optional[str] = None, max_concurrency: int = 4,
+                         filters: Optional[dict] = None,
+                         refine: Optional[Callable[..., Any]] = None) -> list[dict]:
+    """load_parsed for one endpoint across several semesters, concurrently.
+
+    At most max_concurrency semesters are in flight at once over the shared
+    session, and their parses run in worker threads side by side. Returns one
+    entry per semester, in the order given, with its own status so one failed
+    semester does not sink the rest.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def one(semester_id: str) -> dict:
+        entry = {"semester_id": semester_id, "semester": semester_name(semester_id)}
+        try:
+            async with semaphore:
+                result, snapshot = await load_parsed(
+                    f"{endpoint}?semid={semester_id}", parser, model, source, account, filters, refine
+                )
+            entry.update(success(result, snapshot))
+        except Exception as e:
+            entry.update(status="error", message=str(e))
+        return entry
+
+    return list(await asyncio.gather(*(one(semester_id) for semester_id in semester_ids)))
+
+
+def range_response(semesters: list[dict]) -> dict:
+    """Tool response for load_semesters: partial if only some semesters failed."""
+    failed = [entry for entry in semesters if entry["status"] != "success"]
+    if failed and len(failed) == len(semesters):
+        return {"status": "error", "message": "; ".join(f"{e['semester_id']}: {e['message']}" for e in failed)}
+    return {
+        "status": "partial" if failed else "success",
+        "data": {"semesters": semesters, "failed": [entry["semester_id"] for entry in failed]}
+    }
+
+
+async def save_snapshot(roll_no: str, path: str, result: Any) -> None:
+    """Write a live parse to the store, logging rather than raising on failure."""
+    if not ENABLED:
+        return
+    try:
+        await asyncio.to_thread(get_snapshot_store().save, roll_no, path, result)
+    except sqlite3.Error as e:
+        _log(f"Could not store snapshot of {path}: {e}")
+
+
+def success(result: Any, snapshot: Optional[dict]) -> dict:
+    """Tool response for load_parsed, saying when a stored copy was served instead of a live one."""
+    response = {"status": "success", "data": result}
+    if snapshot:
+        response["snapshot"] = snapshot
+    return response
@@ -0,0 +1,174 @@
+import asyncio
+import os
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+# Responses that mean the portal is overloaded or throttling us
+BACKOFF_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SingleFlight:
+    """Coalesce identical in-flight requests so only the first one hits the portal.
+
+    Later callers with the same key await the first caller's result instead of
+    sending their own request. Cancelling one waiter does not cancel the others.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+
+            def forget(done: asyncio.Task) -> None:
+                if self._calls.get(key) is done:
+                    del self._calls[key]
+
+            task.add_done_callback(forget)
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "coalesced": self.coalesced}
+
+
+class TokenBucket:
+    """Allow rate requests per second on average with bursts of up to burst,
+    and hold everything back while the host has asked us to back off."""
+
+    def __init__(self, rate: float, burst: int, max_backoff: float):
+        self.rate = rate
+        self.burst = burst
+        self.max_backoff = max_backoff
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.failures = 0
+        self.waited = 0.0
+        self.backoffs = 0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        # The lock keeps waiters in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                delay = self.blocked_until - now
+                if delay <= 0 and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                if delay <= 0:
+                    delay = (1 - self.tokens) / self.rate
+                self.waited += delay
+                await asyncio.sleep(delay)
+
+    def backoff(self, retry_after: Optional[float]) -> float:
+        """Block the host for Retry-After seconds, or exponentially longer on each failure."""
+        self.failures += 1
+        self.backoffs += 1
+        delay = retry_after if retry_after is not None else 0.5 * 2 ** (self.failures - 1)
+        delay = min(delay, self.max_backoff)
+        self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+        return delay
+
+    def succeeded(self) -> None:
+        self.failures = 0
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """One token bucket per portal host, shared by every account."""
+
+    def __init__(self, rate: float = 5.0, burst: int = 10, max_backoff: float = 60.0, retries: int = 2):
+        self.rate = rate
+        self.burst = burst
+        self.max_backoff = max_backoff
+        self.retries = retries
+        self._buckets: dict[str, TokenBucket] = {}
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        """Build a limiter from FLEX_RATE_LIMIT (requests/second), FLEX_RATE_BURST,
+        FLEX_BACKOFF_MAX (seconds) and FLEX_RATE_RETRIES."""
+        return cls(
+            rate=float(os.getenv("FLEX_RATE_LIMIT", "5")),
+            burst=int(os.getenv("FLEX_RATE_BURST", "10")),
+            max_backoff=float(os.getenv("FLEX_BACKOFF_MAX", "60")),
+            retries=int(os.getenv("FLEX_RATE_RETRIES", "2")),
+        )
+
+    def bucket(self, host: str) -> TokenBucket:
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate, self.burst, self.max_backoff)
+        return self._buckets[host]
+
+    async def acquire(self, host: str) -> None:
+        await self.bucket(host).acquire()
+
+    def record(self, host: str, status_code: int, retry_after: Optional[str] = None) -> bool:
+        """Feed a response status back to the host's bucket. True if the portal asked us to back off."""
+        bucket = self.bucket(host)
+        if status_code in BACKOFF_STATUSES:
+            bucket.backoff(retry_after_seconds(retry_after))
+            return True
+        bucket.succeeded()
+        return False
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "hosts": {
+                host: {
+                    "tokens": round(min(bucket.burst, bucket.tokens + (now - bucket.updated) * bucket.rate), 2),
+                    "backoffs": bucket.backoffs,
+                    "blocked_for": round(max(0.0, bucket.blocked_until - now), 2),
+                    "waited_seconds": round(bucket.waited, 3),
+                }
+                for host, bucket in self._buckets.items()
+            },
+        }
+
+
+_limiter: Optional[RateLimiter] = None
+_flights: Optional[SingleFlight] = None
+
+def get_rate_limiter() -> RateLimiter:
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter.from_env()
+    return _limiter
+
+
+def get_single_flight() -> SingleFlight:
+    global _flights
+    if _flights is None:
+        _flights = SingleFlight()
+    return _flights
@@ -0,0 +1,111 @@
+from typing import Any, Optional, Union
+from tools.mcp_instance import mcp
+from metrics import timed_tool
+from snapshots import load_parsed
+import grading
+
+
+async def _marks_courses(semester_id: str, course_code: Optional[str], source: str, account: Optional[str]) -> list:
+    from parsers.marks import parse_marks
+    from parsers.models import MarksReport
+
+    report, _ = await load_parsed(f"/Student/StudentMarks?semid={semester_id}", parse_marks, MarksReport, source, account)
+    courses = [c for c in report.courses if not course_code or c.course_code.lower() == course_code.lower()]
+    if course_code and not courses:
+        raise LookupError(f"No marks for {course_code} in semester {semester_id}")
+    return courses
+
+
+@mcp.tool()
+@timed_tool
+async def get_course_projections(semester_id: str, course_code: Optional[str] = None,
+                                 source: str = "live", account: Optional[str] = None) -> dict:
+    """
+    Get absolutes so far and the projected final absolutes for each course, computed server side.
+
+    Use this instead of adding up get_marks output yourself.
+
+    Args:
+        semester_id: Semester ID (e.g., '20253' for Fall 2025). Format: YYYY + (1=spring, 2=summer, 3=fall)
+        course_code: Optional course code (e.g. 'CS3001'); all courses if omitted
+        source: "live" (default), "prefer_cache" or "offline", as for get_marks
+        account: Optional roll number to act as, from FLEX_ACCOUNTS_FILE (defaults to FLEX_ROLL_NO)
+
+    Returns:
+        Dictionary with courses, each with:
+        - obtained: absolutes earned so far (out of 100)
+        - graded_weight / remaining_weight: weightage already marked / still to come
+        - percent_so_far: obtained as a percentage of graded_weight
+        - class_average: class average absolutes over the same assessments
+        - projected_absolute: final absolutes if the rest goes like percent_so_far
+        - max_possible: final absolutes with full marks in everything remaining
+    """
+    try:
+        courses = await _marks_courses(semester_id, course_code, source, account)
+        return {"status": "success", "data": {"courses": [grading.course_projection(c) for c in courses]}}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@mcp.tool()
+@timed_tool
+async def get_required_marks(semester_id: str, target: float = 50.0, course_code: Optional[str] = None,
+                             source: str = "live", account: Optional[str] = None) -> dict:
+    """
+    Get the minimum marks needed in the remaining assessments to reach a target absolute.
+
+    Answers "what do I need in the final?". Absolutes are out of 100.
+
+    Args:
+        semester_id: Semester ID (e.g., '20253' for Fall 2025). Format: YYYY + (1=spring, 2=summer, 3=fall)
+        target: Target absolutes for the course (default 50)
+        course_code: Optional course code (e.g. 'CS3001'); all courses if omitted
+        source: "live" (default), "prefer_cache" or "offline", as for get_marks
+        account: Optional roll number to act as, from FLEX_ACCOUNTS_FILE (defaults to FLEX_ROLL_NO)
+
+    Returns:
+        Dictionary with courses, each with obtained, remaining_weight, needed (absolutes),
+        needed_percent_of_remaining (e.g. 60 means 60% in everything left),
+        achievable and already_met
+    """
+    try:
+        courses = await _marks_courses(semester_id, course_code, source, account)
+        return {"status": "success", "data": {"courses": [grading.required_marks(c, target) for c in courses]}}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@mcp.tool()
+@timed_tool
+async def get_gpa_scenarios(scenarios: list[dict[str, Union[str, dict[str, Any]]]],
+                            semester: Optional[str] = None, source: str = "live",
+                            account: Optional[str] = None) -> dict:
+    """
+    Compute SGPA and CGPA for several what-if grade scenarios at once.
+
+    Grade points: A+/A 4.0, A- 3.67, B+ 3.33, B 3.0, B- 2.67, C+ 2.33, C 2.0,
+    C- 1.67, D+ 1.33, D 1.0, F 0.
+
+    Args:
+        scenarios: List of scenarios, each mapping course code to a grade, e.g.
+                   [{"CS3001": "A", "MT2005": "B+"}, {"CS3001": "B"}].
+                   For a course not on the transcript give {"grade": "A", "credits": 3}.
+                   A course already passed in an earlier semester counts as a repeat.
+        semester: Semester the grades belong to: a transcript semester name
+                  (e.g. 'Fall 2025'), the latest one if omitted, or "next" for a
+                  semester after the transcript
+        source: "live" (default), "prefer_cache" or "offline", as for get_transcript
+        account: Optional roll number to act as, from FLEX_ACCOUNTS_FILE (defaults to FLEX_ROLL_NO)
+
+    Returns:
+        Dictionary with semester, current_cgpa, pending (ungraded course codes in
+        that semester) and scenarios, each with grades, sgpa, cgpa and credits
+    """
+    try:
+        from parsers.transcript import parse_transcript
+        from parsers.models import Transcript
+
+        transcript, _ = await load_parsed("/Student/Transcript", parse_transcript, Transcript, source, account)
+        return {"status": "success", "data": grading.gpa_scenarios(transcript, scenarios, semester)}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
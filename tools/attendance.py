@@ -1,33 +1,177 @@
+import asyncio
 from typing import Optional
 from tools.mcp_instance import mcp
-from auth import ensure_logged_in
-from parsers.attendance import parse_attendance
+from metrics import timed_tool
+from snapshots import load_parsed, load_semesters, range_response, success
+from semesters import resolve_semesters
+from auth import get_session
+from attendance_store import get_attendance_store
 
 
 @mcp.tool()
-def get_attendance(semester_id: Optional[str] = None) -> dict:
+@timed_tool
+async def get_attendance(semester_id: Optional[str] = None, course_code: Optional[str] = None,
+                         fields: Optional[list[str]] = None, limit: Optional[int] = None, offset: int = 0,
+                         source: str = "live", account: Optional[str] = None) -> dict:
     """
     Get attendance data for all courses.
     
+    Ask only for what you need: fields=["course_code", "attendance_percentage"]
+    skips every lecture, and course_code skips every other course.
+    
     Args:
         semester_id: Optional semester ID (e.g., '20253' for Fall 2025). 
                      Format: YYYY + (1=spring, 2=summer, 3=fall)
+        course_code: Optional course code (e.g. 'CS3001') to return only that course
+        fields: Optional course fields to return, from course_code, course_name,
+                section, attendance_percentage, lectures
+        limit: Optional maximum number of courses to return
+        offset: Number of courses to skip (default 0)
+        source: "live" (default) fetches from the portal and falls back to the last stored copy
+                if that fails, "prefer_cache" answers from the stored copy when there is one,
+                "offline" only uses stored copies and never touches the network
+        account: Optional roll number to act as, from FLEX_ACCOUNTS_FILE (defaults to FLEX_ROLL_NO)
     
     Returns:
         Dictionary with courses containing:
         - course_code, course_name, section
         - attendance_percentage
         - lectures (list with date, presence P/A)
+        With fields, limit or offset: the selected courses plus total, offset and limit
     """
     try:
-        session = ensure_logged_in()
+        from parsers.attendance import parse_attendance, filter_attendance
+        from parsers.models import AttendanceReport, page, project
         
         path = "/Student/StudentAttendance"
         if semester_id:
             path += f"?semid={semester_id}"
         
-        html = session.get_html(path)
-        result = parse_attendance(html)
-        return {"status": "success", "data": result}
+        # Pushed down into the parser, so skipped courses and lectures are never built
+        filters = {}
+        if course_code:
+            filters["course_code"] = course_code
+        if fields and "lectures" not in fields:
+            filters["lectures"] = False
+        
+        result, snapshot = await load_parsed(
+            path, parse_attendance, AttendanceReport, source, account, filters, filter_attendance
+        )
+        if fields or limit is not None or offset:
+            result = {
+                "courses": project(page(result.courses, limit, offset), fields),
+                "total": len(result.courses),
+                "offset": offset,
+                "limit": limit
+            }
+        return success(result, snapshot)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@mcp.tool()
+@timed_tool
+async def get_attendance_range(semester_ids: Optional[list[str]] = None, start: Optional[str] = None,
+                               end: Optional[str] = None, last: Optional[int] = None,
+                               include_summer: bool = False, course_code: Optional[str] = None,
+                               fields: Optional[list[str]] = None, max_concurrency: int = 4,
+                               source: str = "live", account: Optional[str] = None) -> dict:
+    """
+    Get attendance for several semesters in one call, fetched concurrently.
+    
+    Use this for trends across semesters instead of calling get_attendance once per semester.
+    Give one of semester_ids, start/end or last (at most 12 semesters).
+    fields=["course_code", "attendance_percentage"] skips every lecture.
+    
+    Args:
+        semester_ids: Optional list of semester IDs (e.g. ['20243', '20251'])
+        start: Optional first semester ID of a range (e.g. '20241')
+        end: Optional last semester ID of the range, defaults to the current semester
+        last: Optional number of most recent semesters, up to the current one
+        include_summer: Include summer semesters in start/end and last ranges (default False)
+        course_code: Optional course code (e.g. 'CS3001') to return only that course
+        fields: Optional course fields to return, as for get_attendance
+        max_concurrency: Most semesters fetched at once (default 4)
+        source: "live" (default), "prefer_cache" or "offline", as for get_attendance
+        account: Optional roll number to act as, from FLEX_ACCOUNTS_FILE (defaults to FLEX_ROLL_NO)
+    
+    Returns:
+        Dictionary with:
+        - semesters: oldest first, each with semester_id, semester (e.g. 'Fall 2025'),
+          status and either data (courses, as for get_attendance) or message
+        - failed: semester IDs that could not be loaded
+        Status is "partial" when only some semesters failed
+    """
+    try:
+        from parsers.attendance import parse_attendance, filter_attendance
+        from parsers.models import AttendanceReport, project
+        
+        ids = resolve_semesters(semester_ids, start, end, last, include_summer)
+        filters = {}
+        if course_code:
+            filters["course_code"] = course_code
+        if fields and "lectures" not in fields:
+            filters["lectures"] = False
+        
+        semesters = await load_semesters(
+            "/Student/StudentAttendance", ids, parse_attendance, AttendanceReport, source, account,
+            max_concurrency, filters, filter_attendance
+        )
+        if fields:
+            for entry in semesters:
+                if "data" in entry:
+                    entry["data"] = {"courses": project(entry["data"].courses, fields)}
+        return range_response(semesters)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@mcp.tool()
+@timed_tool
+async def get_attendance_changes(since: Optional[str] = None, semester_id: Optional[str] = None,
+                                 account: Optional[str] = None) -> dict:
+    """
+    Get only the attendance that changed, instead of every lecture.
+    
+    Use this to answer "did I miss anything today?". Each call syncs the
+    portal into a local store and returns the difference. If the portal
+    cannot be reached, it returns an error rather than reporting no changes.
+    
+    Args:
+        since: Optional ISO timestamp (e.g. '2025-10-01T00:00:00+00:00'), usually the
+               synced_at of a previous call. Defaults to the previous sync.
+        semester_id: Optional semester ID (e.g., '20253' for Fall 2025).
+                     Format: YYYY + (1=spring, 2=summer, 3=fall)
+        account: Optional roll number to act as, from FLEX_ACCOUNTS_FILE (defaults to FLEX_ROLL_NO)
+    
+    Returns:
+        Dictionary with:
+        - synced_at: timestamp to pass as since next time
+        - courses: only courses with changes, each with course_code, course_name,
+          current attendance_percentage and the new or changed lectures
+    """
+    try:
+        from parsers.attendance import parse_attendance
+        from parsers.models import AttendanceReport
+        
+        path = "/Student/StudentAttendance"
+        if semester_id:
+            path += f"?semid={semester_id}"
+        
+        result, snapshot = await load_parsed(path, parse_attendance, AttendanceReport, account=account)
+        if snapshot:
+            # A stored copy holds nothing new, syncing it would report "no changes" as if checked live
+            raise RuntimeError(
+                f"Could not check the portal for changes ({snapshot.get('reason', 'served from store')}), "
+                f"last fetched at {snapshot['fetched_at']}"
+            )
+        roll_no = get_session(account).roll_no
+        
+        store = get_attendance_store()
+        previous, synced_at = await asyncio.to_thread(
+            store.sync, roll_no, semester_id or "", result.courses
+        )
+        courses = await asyncio.to_thread(store.changes, roll_no, semester_id or "", since or previous)
+        return {"status": "success", "data": {"synced_at": synced_at, "courses": courses}}
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -1,21 +1,32 @@
+from typing import Optional
 from tools.mcp_instance import mcp
-from auth import ensure_logged_in
-from parsers.courses import parse_courses
+from metrics import timed_tool
+from snapshots import load_parsed, success
 
 
 @mcp.tool()
-def get_courses() -> dict:
+@timed_tool
+async def get_courses(source: str = "live", account: Optional[str] = None) -> dict:
     """
     Get registered courses for current semester.
     
+    Args:
+        source: "live" (default) fetches from the portal and falls back to the last stored copy
+                if that fails, "prefer_cache" answers from the stored copy when there is one,
+                "offline" only uses stored copies and never touches the network
+        account: Optional roll number to act as, from FLEX_ACCOUNTS_FILE (defaults to FLEX_ROLL_NO)
+    
     Returns:
         Dictionary with courses containing:
         - code, name, section, credits, instructor
     """
     try:
-        session = ensure_logged_in()
-        html = session.get_html("/Student/CourseRegistration")
-        result = parse_courses(html)
-        return {"status": "success", "data": result}
+        from parsers.courses import parse_courses
+        from parsers.models import CourseRegistration
+        
+        result, snapshot = await load_parsed(
+            "/Student/CourseRegistration", parse_courses, CourseRegistration, source, account
+        )
+        return success(result, snapshot)
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -1,13 +1,23 @@
+import asyncio
+from typing import Optional
 from tools.mcp_instance import mcp
-from auth import ensure_logged_in
-from parsers.fees import parse_fee_report
+from metrics import timed_tool
+from snapshots import load_parsed, success
+from auth import ensure_logged_in, get_session
 
 
 @mcp.tool()
-def get_fee_report() -> dict:
+@timed_tool
+async def get_fee_report(source: str = "live", account: Optional[str] = None) -> dict:
     """
     Get consolidated fee report with payment history.
     
+    Args:
+        source: "live" (default) fetches from the portal and falls back to the last stored copy
+                if that fails, "prefer_cache" answers from the stored copy when there is one,
+                "offline" only uses stored copies and never touches the network
+        account: Optional roll number to act as, from FLEX_ACCOUNTS_FILE (defaults to FLEX_ROLL_NO)
+    
     Returns:
         Dictionary with:
         - payments: List of payment records with semester, amount, challan_no, 
@@ -15,9 +25,85 @@ def get_fee_report() -> dict:
         - pending: List of pending fee items
     """
     try:
-        session = ensure_logged_in()
-        html = session.get_html("/ConsolidatedFeeReport/ConsolidatedStdFeeReport")
-        result = parse_fee_report(html)
-        return {"status": "success", "data": result}
+        from parsers.fees import parse_fee_report
+        from parsers.models import FeeReport
+        
+        result, snapshot = await load_parsed(
+            "/ConsolidatedFeeReport/ConsolidatedStdFeeReport", parse_fee_report, FeeReport, source, account
+        )
+        return success(result, snapshot)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+def _pick_payment(payments: list, challan_no: Optional[str]):
+    """The fee report row for a challan number, or the latest unpaid (else latest) challan."""
+    if challan_no:
+        for payment in payments:
+            if payment.challan_no == challan_no:
+                return payment
+        raise LookupError(f"Challan {challan_no} is not on the fee report")
+    if not payments:
+        raise LookupError("The fee report has no challans")
+    unpaid = [payment for payment in payments if payment.status.lower() != "paid"]
+    return (unpaid or payments)[-1]
+
+
+@mcp.tool()
+@timed_tool
+async def get_challan(challan_no: Optional[str] = None, refresh: bool = False,
+                      account: Optional[str] = None) -> dict:
+    """
+    Get a fee challan: download it once, then read amount, due date and fee breakdown from the saved copy.
+    
+    Args:
+        challan_no: Optional challan number from get_fee_report; defaults to the latest
+                    unpaid challan (or the latest one if all are paid)
+        refresh: Download the challan again even if it was saved before (default False)
+        account: Optional roll number to act as, from FLEX_ACCOUNTS_FILE (defaults to FLEX_ROLL_NO)
+    
+    Returns:
+        Dictionary with:
+        - challan_no, file (local path of the saved document), sha256, size, content_type, fetched_at
+        - cached: True if no download was needed
+        - challan: challan_no, amount, due_date and breakdown (description, amount per fee head),
+          or None for a PDF when pypdf is not installed
+        - payment: the fee report row for the challan, when the report was looked up
+    """
+    try:
+        from challans import get_challan_store, read_challan
+        from parsers.fees import parse_fee_report
+        from parsers.models import FeeReport
+        
+        store = get_challan_store()
+        roll_no = get_session(account).roll_no
+        entry, payment = None, None
+        if challan_no and not refresh:
+            entry = await asyncio.to_thread(store.lookup, roll_no, challan_no)
+        
+        cached = entry is not None
+        if entry is None:
+            report, _ = await load_parsed(
+                "/ConsolidatedFeeReport/ConsolidatedStdFeeReport", parse_fee_report, FeeReport, account=account
+            )
+            payment = _pick_payment(report.payments, challan_no)
+            challan_no = payment.challan_no
+            if not refresh:
+                entry = await asyncio.to_thread(store.lookup, roll_no, challan_no)
+                cached = entry is not None
+            if entry is None:
+                session = await ensure_logged_in(account)
+                # Concurrent requests for the same challan share one download
+                entry = await session.flights.do(
+                    ("CHALLAN", roll_no, challan_no), lambda: store.download(session, challan_no)
+                )
+        
+        path = store.path(entry)
+        challan = await asyncio.to_thread(read_challan, path, entry["content_type"])
+        data = {"challan_no": challan_no, **entry, "file": str(path), "cached": cached,
+                "challan": challan, "payment": payment}
+        if challan is None:
+            data["message"] = "Saved a PDF challan; install pypdf to read its amount and breakdown"
+        return {"status": "success", "data": data}
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -0,0 +1,109 @@
+import asyncio
+from typing import Optional
+from tools.mcp_instance import mcp
+from metrics import timed_tool
+from auth import get_session
+from snapshots import get_snapshot_store
+
+
+def _group(rows: list[dict], point) -> list[dict]:
+    """One series per semester and course, oldest version first."""
+    series: dict[tuple[str, str], dict] = {}
+    for row in rows:
+        key = (row["semester"], row["course_code"])
+        if key not in series:
+            series[key] = {
+                "semester": row["semester"],
+                "course_code": row["course_code"],
+                "course_name": row.get("course_name", ""),
+                "history": []
+            }
+        series[key]["history"].append({"fetched_at": row["fetched_at"], **point(row)})
+    return list(series.values())
+
+
+@mcp.tool()
+@timed_tool
+async def list_snapshots(account: Optional[str] = None) -> dict:
+    """
+    List the portal data stored locally, available to tools with source="offline".
+
+    Every successful fetch is kept, so semesters the portal no longer shows can still be read.
+
+    Args:
+        account: Optional roll number to act as, from FLEX_ACCOUNTS_FILE (defaults to FLEX_ROLL_NO)
+
+    Returns:
+        Dictionary with snapshots, each with kind (attendance, marks, transcript,
+        courses, fees), semester ('' for the current one), versions (how many times
+        the page changed), first_fetched_at and last_seen_at
+    """
+    try:
+        roll_no = get_session(account).roll_no
+        snapshots = await asyncio.to_thread(get_snapshot_store().inventory, roll_no)
+        return {"status": "success", "data": {"snapshots": snapshots}}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@mcp.tool()
+@timed_tool
+async def get_attendance_trend(course_code: Optional[str] = None, semester_id: Optional[str] = None,
+                               account: Optional[str] = None) -> dict:
+    """
+    Get how attendance changed over time, from locally stored snapshots (no network access).
+
+    Args:
+        course_code: Optional course code (e.g. 'CS3001'); all courses if omitted
+        semester_id: Optional semester ID (e.g., '20253' for Fall 2025); '' for
+                     fetches made without a semester ID; all semesters if omitted
+        account: Optional roll number to act as, from FLEX_ACCOUNTS_FILE (defaults to FLEX_ROLL_NO)
+
+    Returns:
+        Dictionary with courses, each with semester, course_code, course_name and
+        history: fetched_at, attendance_percentage, lectures and absences per stored version
+    """
+    try:
+        roll_no = get_session(account).roll_no
+        rows = await asyncio.to_thread(
+            get_snapshot_store().course_history, roll_no, "attendance", course_code, semester_id
+        )
+        courses = _group(rows, lambda row: {
+            "attendance_percentage": row["attendance_percentage"],
+            "lectures": len(row["lectures"]),
+            "absences": sum(1 for lecture in row["lectures"] if lecture["presence"] == "A")
+        })
+        return {"status": "success", "data": {"courses": courses}}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@mcp.tool()
+@timed_tool
+async def get_marks_history(course_code: Optional[str] = None, semester_id: Optional[str] = None,
+                            account: Optional[str] = None) -> dict:
+    """
+    Get how marks changed over time, from locally stored snapshots (no network access).
+
+    Args:
+        course_code: Optional course code (e.g. 'CS3001'); all courses if omitted
+        semester_id: Optional semester ID (e.g., '20253' for Fall 2025); all semesters if omitted
+        account: Optional roll number to act as, from FLEX_ACCOUNTS_FILE (defaults to FLEX_ROLL_NO)
+
+    Returns:
+        Dictionary with courses, each with semester, course_code, course_name and
+        history: fetched_at, total_obtained, total_weightage and assessments per stored version
+    """
+    try:
+        roll_no = get_session(account).roll_no
+        rows = await asyncio.to_thread(
+            get_snapshot_store().course_history, roll_no, "marks", course_code, semester_id
+        )
+        courses = _group(rows, lambda row: {
+            "total_obtained": row["total_obtained"],
+            "total_weightage": row["total_weightage"],
+            "assessments": row["assessments"]
+        })
+        return {"status": "success", "data": {"courses": courses}}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
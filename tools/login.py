@@ -1,19 +1,25 @@
+from typing import Optional
 from tools.mcp_instance import mcp
+from metrics import timed_tool
 from auth import ensure_logged_in
 
 
 @mcp.tool()
-def login() -> str:
+@timed_tool
+async def login(account: Optional[str] = None) -> str:
     """
     Login to FLEX Student Portal.
     Opens a browser window for automatic reCAPTCHA handling.
     Credentials are read from FLEX_ROLL_NO and FLEX_PASSWORD environment variables.
     
+    Args:
+        account: Optional roll number to act as, from FLEX_ACCOUNTS_FILE (defaults to FLEX_ROLL_NO)
+    
     Returns:
         Success or failure message.
     """
     try:
-        session = ensure_logged_in()
+        session = await ensure_logged_in(account)
         return "Successfully logged in to FLEX Student Portal!"
     except Exception as e:
         return f"Login failed: {str(e)}"
@@ -1,17 +1,54 @@
+from dataclasses import asdict
+from typing import Optional
 from tools.mcp_instance import mcp
-from auth import ensure_logged_in
-from parsers.marks import parse_marks
+from metrics import timed_tool
+from snapshots import load_parsed, load_semesters, range_response, success
+from semesters import resolve_semesters
+from auth import get_session
+
+# Courses returned by the previous get_marks call, per (roll number, semester ID)
+_previous: dict[tuple[str, str], dict] = {}
+
+
+def _record(key: tuple[str, str], courses: list) -> dict:
+    """Remember the courses returned for key, returning the ones remembered before."""
+    previous = _previous.get(key, {})
+    _previous[key] = {course.course_code: course for course in courses}
+    return previous
+
+
+def _changed(previous: dict, courses: list) -> tuple[list, list[str]]:
+    """Split courses into those that differ from previous and the codes of the rest."""
+    changed, unchanged = [], []
+    for course in courses:
+        before = previous.get(course.course_code)
+        # Unchanged panes come back as the same memoized object, compare contents otherwise
+        if before is not None and (before is course or asdict(before) == asdict(course)):
+            unchanged.append(course.course_code)
+        else:
+            changed.append(course)
+    return changed, unchanged
 
 
 @mcp.tool()
-def get_marks(semester_id: str) -> dict:
+@timed_tool
+async def get_marks(semester_id: str, changed_only: bool = False, source: str = "live",
+                    account: Optional[str] = None) -> dict:
     """
     Get marks/grades for all courses.
     
     Args:
         semester_id: Must give semester ID (e.g., '20253' for Fall 2025).
                      Format: YYYY + (1=spring, 2=summer, 3=fall), Only works for latest years
-                     Only works for latest years can't access old years marks
+                     Only works for latest years can't access old years marks,
+                     but semesters fetched before are kept (see source)
+        changed_only: Only return courses whose marks changed since the previous get_marks
+                      call for this semester (with or without changed_only), for cheap
+                      "any new marks?" polling. The first call returns every course.
+        source: "live" (default) fetches from the portal and falls back to the last stored copy
+                if that fails, "prefer_cache" answers from the stored copy when there is one,
+                "offline" only uses stored copies and never touches the network
+        account: Optional roll number to act as, from FLEX_ACCOUNTS_FILE (defaults to FLEX_ROLL_NO)
     
     Returns:
         Dictionary with courses containing:
@@ -19,16 +56,69 @@ def get_marks(semester_id: str) -> dict:
         - assessments (Assignment, Quiz, Sessional-I, etc.)
         - Each assessment has: number, weightage, obtained_marks, total_marks, average
         - total absolutes can be calculated by adding the Total  of weightages for different assessments 
+        With changed_only: courses that changed plus the codes of the unchanged ones
     """
     try:
-        session = ensure_logged_in()
+        from parsers.marks import parse_marks
+        from parsers.models import MarksReport
         
         path = "/Student/StudentMarks"
         if semester_id:
             path += f"?semid={semester_id}"
         
-        html = session.get_html(path)
-        result = parse_marks(html)
-        return {"status": "success", "data": result}
+        result, snapshot = await load_parsed(path, parse_marks, MarksReport, source, account)
+        previous = _record((get_session(account).roll_no, semester_id), result.courses)
+        if changed_only:
+            changed, unchanged = _changed(previous, result.courses)
+            result = {"courses": changed, "unchanged": unchanged}
+        return success(result, snapshot)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@mcp.tool()
+@timed_tool
+async def get_marks_range(semester_ids: Optional[list[str]] = None, start: Optional[str] = None,
+                          end: Optional[str] = None, last: Optional[int] = None,
+                          include_summer: bool = False, course_code: Optional[str] = None,
+                          max_concurrency: int = 4, source: str = "live",
+                          account: Optional[str] = None) -> dict:
+    """
+    Get marks for several semesters in one call, fetched concurrently.
+    
+    Use this for trends across semesters instead of calling get_marks once per semester.
+    Give one of semester_ids, start/end or last (at most 12 semesters).
+    
+    Args:
+        semester_ids: Optional list of semester IDs (e.g. ['20243', '20251'])
+        start: Optional first semester ID of a range (e.g. '20241')
+        end: Optional last semester ID of the range, defaults to the current semester
+        last: Optional number of most recent semesters, up to the current one
+        include_summer: Include summer semesters in start/end and last ranges (default False)
+        course_code: Optional course code (e.g. 'CS3001') to return only that course
+        max_concurrency: Most semesters fetched at once (default 4)
+        source: "live" (default), "prefer_cache" or "offline", as for get_marks
+        account: Optional roll number to act as, from FLEX_ACCOUNTS_FILE (defaults to FLEX_ROLL_NO)
+    
+    Returns:
+        Dictionary with:
+        - semesters: oldest first, each with semester_id, semester (e.g. 'Fall 2025'),
+          status and either data (courses, as for get_marks) or message
+        - failed: semester IDs that could not be loaded
+        Status is "partial" when only some semesters failed
+    """
+    try:
+        from parsers.marks import parse_marks
+        from parsers.models import MarksReport
+        
+        ids = resolve_semesters(semester_ids, start, end, last, include_summer)
+        semesters = await load_semesters(
+            "/Student/StudentMarks", ids, parse_marks, MarksReport, source, account, max_concurrency
+        )
+        if course_code:
+            for entry in semesters:
+                if "data" in entry:
+                    entry["data"] = {"courses": [c for c in entry["data"].courses if c.course_code.lower() == course_code.lower()]}
+        return range_response(semesters)
     except Exception as e:
         return {"status": "error", "message": str(e)}
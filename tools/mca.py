@@ -1,45 +1,192 @@
+import asyncio
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
 from tools.mcp_instance import mcp
-from auth import ensure_logged_in, BASE_URL
+from metrics import timed_tool
+from auth import DATA_DIR, _log, ensure_logged_in, FlexSession
+import snapshots
+from snapshots import get_snapshot_store, load_parsed
+from parsers.models import Semester, Transcript, TranscriptCourse
+
+MCA_FILE = Path(os.getenv("FLEX_MCA_FILE", DATA_DIR / "mca.json")).expanduser()
+
+# MCA for a graded course never changes, so it is kept in MCA_FILE across restarts
+_mca_memo: Optional[dict[str, dict]] = None
+_mca_lock = threading.Lock()
+
+
+def _load_memo() -> dict[str, dict]:
+    global _mca_memo
+    with _mca_lock:
+        if _mca_memo is None:
+            try:
+                _mca_memo = json.loads(MCA_FILE.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                _mca_memo = {}
+        return _mca_memo
+
+
+def _remember(results: dict[str, dict]) -> None:
+    """Add the MCA of graded offers to the memo and write it out."""
+    memo = _load_memo()
+    with _mca_lock:
+        memo.update(results)
+        try:
+            MCA_FILE.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = MCA_FILE.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(memo), encoding="utf-8")
+            os.replace(tmp_path, MCA_FILE)
+        except OSError as e:
+            _log(f"Could not save MCA memo: {e}")
+
+
+def _is_final(course: TranscriptCourse) -> bool:
+    """A course whose grade has been awarded has a fixed MCA."""
+    return course.grade not in ("", "-", "I")
+
+
+async def _graded_offers(session: FlexSession) -> set[str]:
+    """Offer IDs with an awarded grade in the transcript already on hand (cached or stored), never fetching it."""
+    from parsers.transcript import parse_transcript
+
+    path = "/Student/Transcript"
+    transcript = None
+    entry = session.cache.get(session.cache.key(path, session.roll_no))
+    if entry:
+        transcript = await asyncio.to_thread(parse_transcript, entry.text)
+    elif snapshots.ENABLED:
+        stored = await asyncio.to_thread(get_snapshot_store().latest, session.roll_no, path, Transcript)
+        transcript = stored[0] if stored else None
+    if transcript is None:
+        return set()
+    return {
+        course.offer_id
+        for semester in transcript.semesters
+        for course in semester.courses
+        if course.offer_id and _is_final(course)
+    }
+
+
+async def _fetch_mca(session: FlexSession, offer_id: str) -> dict:
+    # Make POST request to API endpoint
+    response = await session.post(
+        "/Student/Populate_GradeSchemeDetails",
+        data={"OfferId": offer_id},
+        coalesce=True
+    )
+    response.raise_for_status()
+
+    data = response.json()
+
+    result = {
+        "grading_schemes": []
+    }
+
+    for item in data:
+        if item.get("GRADING_FACTOR", 0) != 0:
+            result["grading_schemes"].append({
+                "scheme": item.get("GS_TEXT", ""),
+                "mca": item.get("GRADING_FACTOR", 0)
+            })
+
+    return result
 
 
 @mcp.tool()
-def get_mca(offer_id: str) -> dict:
+@timed_tool
+async def get_mca(offer_id: str, account: Optional[str] = None) -> dict:
     """
     Get Modified Class Average (MCA) for a course.
-    
+
     MCA is used for relative grading in courses (mostly electives).
-    The offer_id can be obtained from get_transcript() for courses 
+    The offer_id can be obtained from get_transcript() for courses
     where has_mca is True.
-    
+
+    MCA of a course the transcript already shows as graded is remembered
+    (in FLEX_MCA_FILE), so asking again never reaches the portal.
+
     Args:
         offer_id: The course offer ID (e.g., "15202230205")
-    
+        account: Optional roll number to act as, from FLEX_ACCOUNTS_FILE (defaults to FLEX_ROLL_NO)
+
     Returns:
         Dictionary with grading scheme and MCA value.
     """
     try:
-        session = ensure_logged_in()
-        
-        # Make POST request to API endpoint
-        response = session.client.post(
-            f"{BASE_URL}/Student/Populate_GradeSchemeDetails",
-            data={"OfferId": offer_id}
-        )
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        result = {
-            "grading_schemes": []
-        }
-        
-        for item in data:
-            if item.get("GRADING_FACTOR", 0) != 0:
-                result["grading_schemes"].append({
-                    "scheme": item.get("GS_TEXT", ""),
-                    "mca": item.get("GRADING_FACTOR", 0)
-                })
-        
+        memo = await asyncio.to_thread(_load_memo)
+        if offer_id in memo:
+            return {"status": "success", "data": memo[offer_id]}
+
+        session = await ensure_logged_in(account)
+        result = await _fetch_mca(session, offer_id)
+        if offer_id in await _graded_offers(session):
+            await asyncio.to_thread(_remember, {offer_id: result})
         return {"status": "success", "data": result}
     except Exception as e:
         return {"status": "error", "message": str(e)}
+
+
+@mcp.tool()
+@timed_tool
+async def get_mca_for_transcript(max_concurrency: int = 4, account: Optional[str] = None) -> dict:
+    """
+    Get Modified Class Average (MCA) for every relatively graded course in the transcript.
+
+    Use this instead of calling get_mca once per offer_id. MCA values of
+    graded courses are remembered, so repeat calls only fetch new courses.
+
+    Args:
+        max_concurrency: Maximum number of MCA requests in flight at once (default 4)
+        account: Optional roll number to act as, from FLEX_ACCOUNTS_FILE (defaults to FLEX_ROLL_NO)
+
+    Returns:
+        Dictionary with courses, each containing:
+        - semester, code, name, grade, offer_id
+        - status: success or error (with message) for that course
+        - grading_schemes: list with scheme and mca
+    """
+    try:
+        from parsers.transcript import parse_transcript
+
+        session = await ensure_logged_in(account)
+        transcript, _ = await load_parsed("/Student/Transcript", parse_transcript, Transcript, account=account)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        memo = await asyncio.to_thread(_load_memo)
+        graded: dict[str, dict] = {}
+
+        async def fetch(semester: Semester, course: TranscriptCourse) -> dict:
+            offer_id = course.offer_id
+            entry = {
+                "semester": semester.name,
+                "code": course.code,
+                "name": course.name,
+                "grade": course.grade,
+                "offer_id": offer_id
+            }
+
+            result = memo.get(offer_id)
+            if result is None:
+                try:
+                    async with semaphore:
+                        result = await _fetch_mca(session, offer_id)
+                except Exception as e:
+                    return {**entry, "status": "error", "message": str(e)}
+                if _is_final(course):
+                    graded[offer_id] = result
+
+            return {**entry, "status": "success", **result}
+
+        courses = await asyncio.gather(*(
+            fetch(semester, course)
+            for semester in transcript.semesters
+            for course in semester.courses
+            if course.has_mca
+        ))
+        if graded:
+            await asyncio.to_thread(_remember, graded)
+        return {"status": "success", "data": {"courses": courses}}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
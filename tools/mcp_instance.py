@@ -1,6 +1,8 @@
 from fastmcp import FastMCP
+from metrics import MetricsMiddleware
 
 mcp = FastMCP(
     "FLEX Student Portal",
     instructions="Access your FLEX Student Portal data - attendance, marks, transcript, courses, and fees"
 )
+mcp.add_middleware(MetricsMiddleware())
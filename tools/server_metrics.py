@@ -0,0 +1,52 @@
+from tools.mcp_instance import mcp
+from metrics import get_metrics, timed_tool
+from cache import get_cache
+from throttle import get_single_flight
+
+
+@mcp.tool()
+@timed_tool
+async def get_server_metrics(format: str = "json") -> dict:
+    """
+    Get latency and traffic metrics for this server, to tell whether slowness
+    comes from the login, the network, parsing or serialization.
+    
+    Args:
+        format: "json" (default) for p50/p95/p99 per span, or "prometheus" for
+                the Prometheus text exposition format
+    
+    Returns:
+        Dictionary with:
+        - spans: latency per name and labels (count, mean_ms, p50_ms, p95_ms, p99_ms)
+          - tool: whole tool call, tool_body: the tool itself, serialize: result serialization
+          - login: per phase (session_load, probe, browser, driver_start, captcha, session_save)
+          - fetch: per endpoint, parse: per parser
+        - counters: tool_calls, tool_errors and fetch_bytes (bytes received per endpoint)
+        - cache: response cache stats including hit_ratio
+        - marks_memo: hits and misses of the parsed marks pane memo
+        Or, for prometheus, the text under "text".
+    """
+    try:
+        from parsers.marks import memo_stats
+        
+        metrics = get_metrics()
+        cache = get_cache().stats()
+        flights = get_single_flight().stats()
+        marks_memo = memo_stats()
+        if format == "prometheus":
+            gauges = {
+                "cache_hits": cache["hits"],
+                "cache_misses": cache["misses"],
+                "cache_hit_ratio": cache["hit_ratio"] or 0,
+                "cache_bytes": cache["bytes"],
+                "coalesced_requests": flights["coalesced"],
+                "marks_memo_hits": marks_memo["hits"],
+                "marks_memo_misses": marks_memo["misses"],
+            }
+            return {"status": "success", "data": {"text": metrics.prometheus(gauges)}}
+        if format != "json":
+            return {"status": "error", "message": f"Unknown format {format!r}, use 'json' or 'prometheus'"}
+        data = {**metrics.snapshot(), "cache": cache, "coalescing": flights, "marks_memo": marks_memo}
+        return {"status": "success", "data": data}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
@@ -0,0 +1,119 @@
+import asyncio
+from typing import Any, Callable, Optional
+from tools.mcp_instance import mcp
+from metrics import timed_tool
+from snapshots import load_parsed, success
+
+
+async def _fetch_source(path: str, parser: Callable[[str], Any], model: type,
+                        source: str, account: Optional[str]) -> dict:
+    """Fetch and parse one page, reporting failure instead of raising."""
+    try:
+        return success(*await load_parsed(path, parser, model, source, account))
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+def _merge_courses(courses: dict, attendance: dict, marks: dict) -> list[dict]:
+    """Join registration, attendance and marks records on course code."""
+    merged: dict[str, dict] = {}
+
+    def record(code: str, name: str, section: str) -> dict:
+        if code not in merged:
+            merged[code] = {
+                "course_code": code,
+                "course_name": name,
+                "section": section,
+                "registration": None,
+                "attendance": None,
+                "marks": None
+            }
+        return merged[code]
+
+    if "data" in courses:
+        for course in courses["data"].courses:
+            record(course.code, course.name, course.section)["registration"] = {
+                "credits": course.credits,
+                "instructor": course.instructor
+            }
+
+    if "data" in attendance:
+        for course in attendance["data"].courses:
+            if not course.course_code:
+                continue
+            record(course.course_code, course.course_name, course.section)["attendance"] = {
+                "attendance_percentage": course.attendance_percentage,
+                "lectures": course.lectures
+            }
+
+    if "data" in marks:
+        for course in marks["data"].courses:
+            record(course.course_code, course.course_name, course.section)["marks"] = {
+                "assessments": course.assessments,
+                "total_obtained": course.total_obtained,
+                "total_weightage": course.total_weightage
+            }
+
+    return list(merged.values())
+
+
+@mcp.tool()
+@timed_tool
+async def get_semester_snapshot(semester_id: Optional[str] = None, source: str = "live",
+                                account: Optional[str] = None) -> dict:
+    """
+    Get attendance, marks and registered courses for a semester in one call.
+
+    Fetches the three pages concurrently and joins them on course code.
+    Use this instead of calling get_attendance, get_marks and get_courses separately.
+
+    Args:
+        semester_id: Optional semester ID (e.g., '20253' for Fall 2025).
+                     Format: YYYY + (1=spring, 2=summer, 3=fall)
+                     Course registration is always for the current semester.
+        source: "live" (default) fetches from the portal and falls back to the last stored copy
+                if that fails, "prefer_cache" answers from the stored copy when there is one,
+                "offline" only uses stored copies and never touches the network
+        account: Optional roll number to act as, from FLEX_ACCOUNTS_FILE (defaults to FLEX_ROLL_NO)
+
+    Returns:
+        Dictionary with:
+        - sources: status of each sub-fetch (attendance, marks, courses);
+                   a failed source has a message and is left out of the merge,
+                   one served from the store has a snapshot with its fetched_at
+        - courses: one record per course_code with course_name, section and
+                   registration (credits, instructor), attendance
+                   (attendance_percentage, lectures) and marks (assessments,
+                   total_obtained, total_weightage), each None if unavailable
+    """
+    try:
+        from parsers.attendance import parse_attendance
+        from parsers.marks import parse_marks
+        from parsers.courses import parse_courses
+        from parsers.models import AttendanceReport, CourseRegistration, MarksReport
+
+        query = f"?semid={semester_id}" if semester_id else ""
+        attendance, marks, courses = await asyncio.gather(
+            _fetch_source(f"/Student/StudentAttendance{query}", parse_attendance, AttendanceReport, source, account),
+            _fetch_source(f"/Student/StudentMarks{query}", parse_marks, MarksReport, source, account),
+            _fetch_source("/Student/CourseRegistration", parse_courses, CourseRegistration, source, account),
+        )
+
+        sources = {"attendance": attendance, "marks": marks, "courses": courses}
+        failed = [name for name, source in sources.items() if source["status"] != "success"]
+        if len(failed) == len(sources):
+            return {"status": "error", "message": "; ".join(f"{n}: {sources[n]['message']}" for n in failed)}
+
+        return {
+            "status": "partial" if failed else "success",
+            "data": {
+                "semester_id": semester_id,
+                "sources": {
+                    name: {k: v for k, v in source.items() if k != "data"}
+                    for name, source in sources.items()
+                },
+                "courses": _merge_courses(courses, attendance, marks)
+            }
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
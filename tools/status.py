@@ -1,18 +1,41 @@
+from typing import Optional
 from tools.mcp_instance import mcp
-from auth import get_session
+from metrics import timed_tool
+from auth import get_session, get_registry
+from throttle import get_rate_limiter, get_single_flight
+from prefetch import get_prefetcher
 
 
 @mcp.tool()
-def check_login_status() -> dict:
+@timed_tool
+async def check_login_status(account: Optional[str] = None) -> dict:
     """
     Check if currently logged in to FLEX portal.
     
+    Args:
+        account: Optional roll number to act as, from FLEX_ACCOUNTS_FILE (defaults to FLEX_ROLL_NO)
+    
     Returns:
-        Dictionary with logged_in status and cookies_count.
+        Dictionary with logged_in status, cookies_count, response cache stats
+        the accounts with an open session, rate limiter and request
+        coalescing stats, and background prefetch progress.
     """
-    session = get_session()
+    try:
+        session = get_session(account)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+    registry = get_registry()
     return {
         "status": "success",
         "logged_in": session.is_logged_in(),
-        "cookies_count": len(session.cookies) if session.cookies else 0
+        "cookies_count": len(session.cookies) if session.cookies else 0,
+        "cache": session.cache.stats(),
+        "sessions": {
+            "open": [s.roll_no for s in registry.sessions()],
+            "max_sessions": registry.max_sessions,
+            "evictions": registry.evictions
+        },
+        "rate_limiter": get_rate_limiter().stats(),
+        "coalescing": get_single_flight().stats(),
+        "prefetch": get_prefetcher().stats()
     }
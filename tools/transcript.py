@@ -1,18 +1,39 @@
+from typing import Optional
 from tools.mcp_instance import mcp
-from auth import ensure_logged_in
-from parsers.transcript import parse_transcript
+from metrics import timed_tool
+from snapshots import load_parsed, success
+from semesters import semester_name
 
 
 @mcp.tool()
-def get_transcript() -> dict:
+@timed_tool
+async def get_transcript(semester: Optional[str] = None, course_code: Optional[str] = None,
+                         fields: Optional[list[str]] = None, limit: Optional[int] = None, offset: int = 0,
+                         source: str = "live", account: Optional[str] = None) -> dict:
     """
     Get full academic transcript with all semesters.
     
+    Ask only for what you need: fields=["name", "sgpa", "cgpa"] skips every
+    course, and semester skips every other semester.
+    
     Grading System:
     - Core courses: Use absolute grading (fixed grade boundaries)
     - Elective courses: Use relative grading with MCA (Modified Class Average)
       - Courses with has_mca=True have an offer_id to fetch MCA details
     
+    Args:
+        semester: Optional semester to return, by name ('Fall 2024') or ID ('20243')
+        course_code: Optional course code (e.g. 'CS3001') to return only that course
+                     and the semesters it was taken in
+        fields: Optional semester fields to return, from name, credits_attempted,
+                credits_earned, cgpa, sgpa, courses
+        limit: Optional maximum number of semesters to return
+        offset: Number of semesters to skip (default 0)
+        source: "live" (default) fetches from the portal and falls back to the last stored copy
+                if that fails, "prefer_cache" answers from the stored copy when there is one,
+                "offline" only uses stored copies and never touches the network
+        account: Optional roll number to act as, from FLEX_ACCOUNTS_FILE (defaults to FLEX_ROLL_NO)
+    
     Returns:
         Dictionary with:
         - student_info: ARN, Roll No, Name, Batch
@@ -20,11 +41,34 @@ def get_transcript() -> dict:
           - name, credits_attempted, credits_earned, cgpa, sgpa
           - courses: code, name, grade, credit_hours, points, type, offer_id, has_mca
         - cgpa: Final cumulative GPA
+        With fields, limit or offset, semesters holds the selected semesters
+        and total, offset and limit are added
     """
     try:
-        session = ensure_logged_in()
-        html = session.get_html("/Student/Transcript")
-        result = parse_transcript(html)
-        return {"status": "success", "data": result}
+        from parsers.transcript import parse_transcript, filter_transcript
+        from parsers.models import Transcript, page, project
+        
+        # Pushed down into the parser, so skipped semesters and courses are never built
+        filters = {}
+        if semester:
+            filters["semester"] = semester_name(semester) if semester.isdigit() else semester
+        if course_code:
+            filters["course_code"] = course_code
+        if fields and "courses" not in fields:
+            filters["courses"] = False
+        
+        result, snapshot = await load_parsed(
+            "/Student/Transcript", parse_transcript, Transcript, source, account, filters, filter_transcript
+        )
+        if fields or limit is not None or offset:
+            result = {
+                "student_info": result.student_info,
+                "semesters": project(page(result.semesters, limit, offset), fields),
+                "cgpa": result.cgpa,
+                "total": len(result.semesters),
+                "offset": offset,
+                "limit": limit
+            }
+        return success(result, snapshot)
     except Exception as e:
         return {"status": "error", "message": str(e)}